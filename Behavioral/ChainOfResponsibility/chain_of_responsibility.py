@@ -1,50 +1,87 @@
 from abc import ABC, abstractmethod
+from itertools import groupby
+from operator import itemgetter
+
+
+# Default Sink: writes every line straight to stdout
+class PrintSink:
+    def write(self, line):
+        print(line)
+
+    def write_many(self, lines):
+        print("\n".join(lines))
+
+
+# Shared by every handler built without a sink, so their lines form one stream
+DEFAULT_SINK = PrintSink()
+
+
+def write_runs(routed):
+    # routed: (sink, line) pairs in message order. Each run of consecutive lines for
+    # the same sink goes out in one write_many call, so the output keeps that order.
+    for sink, run in groupby(routed, key=itemgetter(0)):
+        sink.write_many([line for _, line in run])
+
+
+def unknown_severity(severity):
+    return f"Unknow severity level: {severity}\n"
 
 
 # Handler interface
 class Logger(ABC):
-    def __init__(self, level):
+    def __init__(self, level, sink=None):
         self.level = level
         self.next_logger = None
+        self.sink = DEFAULT_SINK if sink is None else sink
 
     def set_next(self, next_logger):
         self.next_logger = next_logger
         return next_logger
 
-    @abstractmethod
     def log(self, message, severity):
+        if severity <= self.level:
+            self.write(message)
+        elif self.next_logger:
+            self.next_logger.log(message, severity)
+        else:
+            self.sink.write(unknown_severity(severity))
+
+    def log_many(self, messages):
+        # Route the whole batch, then write it to the sinks run by run
+        write_runs(self.route(message, severity) for message, severity in messages)
+
+    def route(self, message, severity):
+        # The (sink, line) that log() would write for this message; no handler takes it,
+        # the last one in the chain reports the unknown severity to its sink
+        logger = self
+        while severity > logger.level:
+            if logger.next_logger is None:
+                return logger.sink, unknown_severity(severity)
+            logger = logger.next_logger
+        return logger.sink, logger.format(message)
+
+    def write(self, message):
+        self.sink.write(self.format(message))
+
+    @abstractmethod
+    def format(self, message):
         pass
 
 
 # Concrete Handlers
 class InfoLogger(Logger):
-    def log(self, message, severity):
-        if severity <= self.level:
-            print(f"\n[INFO]: {message}\n")
-        elif self.next_logger:
-            self.next_logger.log(message, severity)
-        else:
-            print(f"Unknow severity level: {severity}\n")
+    def format(self, message):
+        return f"\n[INFO]: {message}\n"
 
 
 class DebugLogger(Logger):
-    def log(self, message, severity):
-        if severity <= self.level:
-            print(f"\n[DEBUG]: {message}\n")
-        elif self.next_logger:
-            self.next_logger.log(message, severity)
-        else:
-            print(f"Unknow severity level: {severity}\n")
+    def format(self, message):
+        return f"\n[DEBUG]: {message}\n"
 
 
 class ErrorLogger(Logger):
-    def log(self, message, severity):
-        if severity <= self.level:
-            print(f"\n[ERROR]: {message}\n")
-        elif self.next_logger:
-            self.next_logger.log(message, severity)
-        else:
-            print(f"Unknow severity level: {severity}\n")
+    def format(self, message):
+        return f"\n[ERROR]: {message}\n"
 
 
 # Client
@@ -61,3 +98,6 @@ if __name__ == "__main__":
     # Send messages with different severity levels
     for i in range(1, 7):
         info_logger.log(f"This is a message with severity {i}.", severity=i)
+
+    # Route and write a whole batch in one pass
+    info_logger.log_many((f"Batched message {i}.", i) for i in range(1, 4))
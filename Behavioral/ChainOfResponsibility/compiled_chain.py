@@ -0,0 +1,109 @@
+from bisect import bisect_left
+import random
+import time
+
+from chain_of_responsibility import (
+    Logger,
+    InfoLogger,
+    DebugLogger,
+    ErrorLogger,
+    unknown_severity,
+    write_runs,
+)
+
+
+# Compiled Chain: the linked chain frozen into a sorted severity -> handler table
+class CompiledChain:
+    def __init__(self, head: Logger):
+        self._bounds = []  # Strictly increasing upper severity bound per handler
+        self._handlers = []
+
+        # A handler only receives severities above every earlier handler's level,
+        # so handlers shadowed by an earlier, higher level are dropped.
+        logger = head
+        while logger:
+            if not self._bounds or logger.level > self._bounds[-1]:
+                self._bounds.append(logger.level)
+                self._handlers.append(logger)
+            self._tail = logger  # Reports unknown severities, as in the linked chain
+            logger = logger.next_logger
+
+    def log(self, message, severity):
+        index = bisect_left(self._bounds, severity)
+        if index < len(self._handlers):
+            self._handlers[index].write(message)
+        else:
+            self._tail.sink.write(unknown_severity(severity))
+
+    def log_many(self, messages):
+        write_runs(self.route(message, severity) for message, severity in messages)
+
+    def route(self, message, severity):
+        index = bisect_left(self._bounds, severity)
+        if index < len(self._handlers):
+            handler = self._handlers[index]
+            return handler.sink, handler.format(message)
+        return self._tail.sink, unknown_severity(severity)
+
+
+# Benchmark Handler: counts messages instead of printing them
+class CountingLogger(Logger):
+    def __init__(self, level):
+        super().__init__(level)
+        self.count = 0
+
+    def write(self, message):
+        self.count += 1
+
+    def format(self, message):
+        return message
+
+
+def build_chain(length):
+    head = CountingLogger(level=1)
+    logger = head
+    for level in range(2, length + 1):
+        logger = logger.set_next(CountingLogger(level=level))
+    return head
+
+
+def benchmark(lengths=(3, 30, 300), messages=200_000):
+    print(f"{'chain':>6} {'linked msg/s':>14} {'compiled msg/s':>16} {'speedup':>8}")
+    for length in lengths:
+        head = build_chain(length)
+        compiled = CompiledChain(head)
+        severities = [random.randint(1, length) for _ in range(messages)]
+
+        start = time.perf_counter()
+        for severity in severities:
+            head.log("message", severity)
+        linked = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for severity in severities:
+            compiled.log("message", severity)
+        table = time.perf_counter() - start
+
+        print(
+            f"{length:>6} {messages / linked:>14,.0f} "
+            f"{messages / table:>16,.0f} {linked / table:>7.1f}x"
+        )
+
+
+# Client
+if __name__ == "__main__":
+    info_logger = InfoLogger(level=1)
+    debug_logger = DebugLogger(level=2)
+    error_logger = ErrorLogger(level=3)
+
+    info_logger\
+        .set_next(debug_logger)\
+        .set_next(error_logger)
+
+    # Freeze the chain once the wiring is finished
+    chain = CompiledChain(info_logger)
+    for i in range(1, 5):
+        chain.log(f"This is a message with severity {i}.", severity=i)
+
+    print("Linked walk vs compiled table:\n")
+    benchmark()
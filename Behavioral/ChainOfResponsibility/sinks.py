@@ -0,0 +1,192 @@
+from collections import deque
+from contextlib import redirect_stdout
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from chain_of_responsibility import InfoLogger, DebugLogger, ErrorLogger
+
+
+# Ring Buffer Sink: keeps only the most recent lines in memory
+class RingBufferSink:
+    def __init__(self, capacity=10_000):
+        self._lines = deque(maxlen=capacity)
+
+    def write(self, line):
+        self._lines.append(line)
+
+    def write_many(self, lines):
+        self._lines.extend(lines)
+
+    def lines(self):
+        return list(self._lines)
+
+
+# Batched File Sink: buffers lines and flushes them by size, and by age from a background
+# timer, so a quiet logger's last lines still reach the file within max_delay
+class BatchedFileSink:
+    def __init__(self, path, max_lines=1_000, max_delay=1.0):
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer = []
+        self._max_lines = max_lines
+        self._max_delay = max_delay
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def write(self, line):
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self._max_lines:
+                self._flush()
+
+    def write_many(self, lines):
+        with self._lock:
+            self._buffer.extend(lines)
+            if len(self._buffer) >= self._max_lines:
+                self._flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self._max_delay):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._buffer.append("")  # Terminate the last line
+            self._file.write("\n".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self._closed.set()
+        self._timer.join()
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Queue Sink: hands lines to a background thread that drains them into another sink
+class QueueSink:
+    _STOP = object()
+
+    def __init__(self, sink, max_size=10_000):
+        self._sink = sink
+        self._queue = queue.Queue(maxsize=max_size)  # Bounded: callers block when full
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._worker.start()
+
+    def write(self, line):
+        self._queue.put([line])
+
+    def write_many(self, lines):
+        self._queue.put(list(lines))
+
+    def _drain(self):
+        while True:
+            batch = self._queue.get()
+            if batch is self._STOP:
+                return
+            # Coalesce whatever else is already waiting into a single write
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is self._STOP:
+                    self._sink.write_many(batch)
+                    return
+                batch.extend(more)
+            self._sink.write_many(batch)
+
+    def close(self):
+        self._queue.put(self._STOP)
+        self._worker.join()
+        if hasattr(self._sink, "close"):
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_chain(sink=None):
+    info_logger = InfoLogger(level=1, sink=sink)
+    info_logger\
+        .set_next(DebugLogger(level=2, sink=sink))\
+        .set_next(ErrorLogger(level=3, sink=sink))
+    return info_logger
+
+
+def benchmark(directory, messages=200_000, batch_size=1_000):
+    records = [(f"message {i}", i % 3 + 1) for i in range(messages)]
+    batches = [records[i:i + batch_size] for i in range(0, messages, batch_size)]
+
+    def run(name, setup, use_batches):
+        chain, sink = setup()
+        start = time.perf_counter()
+        if use_batches:
+            for batch in batches:
+                chain.log_many(batch)
+        else:
+            for message, severity in records:
+                chain.log(message, severity)
+        if hasattr(sink, "close"):
+            sink.close()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<32} {messages / elapsed:>14,.0f} msg/s")
+
+    def ring_buffer():
+        sink = RingBufferSink()
+        return build_chain(sink), sink
+
+    def batched_file():
+        sink = BatchedFileSink(os.path.join(directory, "batched.log"))
+        return build_chain(sink), sink
+
+    def queued_file():
+        sink = QueueSink(BatchedFileSink(os.path.join(directory, "queued.log")))
+        return build_chain(sink), sink
+
+    # The print path writes to a file too, so only the write strategy differs
+    with open(os.path.join(directory, "print.log"), "w") as stdout:
+        with redirect_stdout(stdout):
+            start = time.perf_counter()
+            chain = build_chain()
+            for message, severity in records:
+                chain.log(message, severity)
+            stdout.flush()
+            elapsed = time.perf_counter() - start
+    print(f"{'print (current)':<32} {messages / elapsed:>14,.0f} msg/s")
+
+    run("ring buffer", ring_buffer, False)
+    run("ring buffer + log_many", ring_buffer, True)
+    run("batched file", batched_file, False)
+    run("batched file + log_many", batched_file, True)
+    run("queue -> batched file", queued_file, False)
+    run("queue -> batched file + log_many", queued_file, True)
+
+
+# Client
+if __name__ == "__main__":
+    ring = RingBufferSink(capacity=2)
+    chain = build_chain(ring)
+    chain.log_many((f"Message with severity {i}.", i) for i in range(1, 4))
+    print("Ring buffer keeps the two most recent lines:", ring.lines())
+
+    print("\nThroughput against the print path:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark(directory)
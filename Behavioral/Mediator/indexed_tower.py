@@ -0,0 +1,140 @@
+from contextlib import redirect_stdout
+import io
+import random
+import time
+from typing import Dict, Set
+
+from mediator import AirTrafficControlTower, Aircraft, ControlTower
+
+
+# Concrete Mediator with name and channel indexes
+class IndexedControlTower(AirTrafficControlTower):
+    def __init__(self, verbose=True):
+        self._aircrafts: Dict[str, Aircraft] = {}  # name -> aircraft, insertion-ordered
+        self._channels: Dict[str, Set[str]] = {}  # channel -> names of its members
+        self._memberships: Dict[str, Set[str]] = {}  # name -> channels it joined
+        self._verbose = verbose
+
+    def register_aircraft(self, aircraft):
+        self._aircrafts[aircraft.name] = aircraft
+        self._memberships[aircraft.name] = set()
+        if self._verbose:
+            print(f"Control Tower: {aircraft.name} has entered the airspace.")
+
+    def unregister_aircraft(self, aircraft):
+        del self._aircrafts[aircraft.name]
+        for channel in self._memberships.pop(aircraft.name):
+            self._channels[channel].discard(aircraft.name)
+        if self._verbose:
+            print(f"Control Tower: {aircraft.name} has left the airspace.")
+
+    def join_channel(self, aircraft, channel):
+        self._channels.setdefault(channel, set()).add(aircraft.name)
+        self._memberships[aircraft.name].add(channel)
+
+    def leave_channel(self, aircraft, channel):
+        self._channels[channel].discard(aircraft.name)
+        self._memberships[aircraft.name].discard(channel)
+
+    def send_message(self, sender, message):
+        for aircraft in self._aircrafts.values():
+            if aircraft is not sender:  # Don't send the message back to the sender
+                aircraft.receive_message(sender, message)
+
+    def send_direct(self, sender, recipient_name, message):
+        self._aircrafts[recipient_name].receive_message(sender, message)
+
+    def send_to_channel(self, sender, channel, message):
+        for name in self._channels.get(channel, ()):
+            if name != sender.name:
+                self._aircrafts[name].receive_message(sender, message)
+
+    def send_many(self, sender, messages, channel=None):
+        # Resolve the audience once for the whole batch
+        if channel is None:
+            audience = [a for a in self._aircrafts.values() if a is not sender]
+        else:
+            audience = [
+                self._aircrafts[name]
+                for name in self._channels.get(channel, ())
+                if name != sender.name
+            ]
+        messages = list(messages)
+        for aircraft in audience:
+            for message in messages:
+                aircraft.receive_message(sender, message)
+
+
+# Benchmark Colleague: counts messages instead of printing them
+class QuietAircraft(Aircraft):
+    def __init__(self, name, control_tower):
+        self.received = 0
+        super().__init__(name, control_tower)
+
+    def receive_message(self, sender, message):
+        self.received += 1
+
+
+def timed(action, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark(sizes=(100, 10_000, 100_000), sector_size=100, operations=10_000):
+    print(
+        f"{'aircraft':>9} {'list broadcast':>15} {'dict broadcast':>15} "
+        f"{'direct/s':>12} {'channel/s':>12} {'unregister/s':>13}"
+    )
+    for size in sizes:
+        names = [f"Flight {i}" for i in range(size)]
+
+        # The original tower prints on every registration; keep that off the terminal
+        listed = ControlTower()
+        with redirect_stdout(io.StringIO()):
+            listed_fleet = [QuietAircraft(name, listed) for name in names]
+        list_broadcast = timed(lambda: listed.send_message(listed_fleet[0], "Hello"), 3)
+
+        tower = IndexedControlTower(verbose=False)
+        fleet = [QuietAircraft(name, tower) for name in names]
+        for index, aircraft in enumerate(fleet):
+            tower.join_channel(aircraft, f"sector {index // sector_size}")
+        dict_broadcast = timed(lambda: tower.send_message(fleet[0], "Hello"), 3)
+
+        sender = fleet[0]
+        targets = [random.choice(names) for _ in range(operations)]
+        direct = timed(lambda: [tower.send_direct(sender, t, "Hi") for t in targets])
+
+        channel = timed(lambda: tower.send_to_channel(sender, "sector 0", "Hold"), 100)
+
+        leaving = random.sample(fleet, min(operations, size // 2))
+        unregister = timed(lambda: [tower.unregister_aircraft(a) for a in leaving])
+
+        print(
+            f"{size:>9,} {list_broadcast * 1000:>12.3f} ms {dict_broadcast * 1000:>12.3f} ms "
+            f"{operations / direct:>12,.0f} {1 / channel:>12,.0f} "
+            f"{len(leaving) / unregister:>13,.0f}"
+        )
+
+
+# Usage
+if __name__ == "__main__":
+    control_tower = IndexedControlTower()
+
+    aircraft1 = Aircraft("Flight 101", control_tower)
+    aircraft2 = Aircraft("Flight 202", control_tower)
+    aircraft3 = Aircraft("Flight 303", control_tower)
+
+    control_tower.join_channel(aircraft1, "north sector")
+    control_tower.join_channel(aircraft2, "north sector")
+
+    control_tower.send_direct(aircraft1, "Flight 303", "Please keep your distance.")
+    control_tower.send_to_channel(aircraft2, "north sector", "Turbulence ahead.")
+    control_tower.send_many(aircraft3, ["Holding position.", "Awaiting instructions."])
+
+    control_tower.unregister_aircraft(aircraft2)
+    aircraft3.send_message("Runway is clear.")
+
+    print()
+    benchmark()
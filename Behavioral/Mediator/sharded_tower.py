@@ -0,0 +1,211 @@
+import multiprocessing as mp
+import os
+import random
+import time
+import zlib
+
+from mediator import AirTrafficControlTower, Aircraft
+
+
+def shard_of(name, shards):
+    # crc32 rather than hash(): str hashes are salted differently in every process
+    return zlib.crc32(name.encode()) % shards
+
+
+# Stand-in for a sender that lives in another process; receivers only read .name
+class RemoteSender:
+    def __init__(self, name):
+        self.name = name
+
+
+# Shard Mediator: runs inside a worker process and owns the aircraft hashed to it
+class _ShardTower(AirTrafficControlTower):
+    def __init__(self, index, inboxes, in_flight):
+        self._index = index
+        self._inboxes = inboxes
+        self._in_flight = in_flight
+        self._aircrafts = {}
+        self._outboxes = [[] for _ in inboxes]
+        self.delivered = 0
+
+    def register_aircraft(self, aircraft):
+        self._aircrafts[aircraft.name] = aircraft
+
+    # Messages sent by the aircraft of this shard go through the queues like any other
+    def send_message(self, sender, message):
+        for outbox in self._outboxes:
+            outbox.append(("broadcast", sender.name, message))
+
+    def send_direct(self, sender, recipient_name, message):
+        shard = shard_of(recipient_name, len(self._inboxes))
+        self._outboxes[shard].append(("direct", sender.name, recipient_name, message))
+
+    def handle(self, aircraft_class, command):
+        kind = command[0]
+        if kind == "register":
+            aircraft_class(command[1], self)  # Aircraft.__init__ registers itself
+        elif kind == "unregister":
+            self._aircrafts.pop(command[1], None)
+        elif kind == "broadcast":
+            _, sender_name, message = command
+            sender = RemoteSender(sender_name)
+            for aircraft in list(self._aircrafts.values()):
+                if aircraft.name != sender_name:
+                    aircraft.receive_message(sender, message)
+                    self.delivered += 1
+        elif kind == "direct":
+            _, sender_name, recipient_name, message = command
+            aircraft = self._aircrafts.get(recipient_name)
+            if aircraft is not None:
+                aircraft.receive_message(RemoteSender(sender_name), message)
+                self.delivered += 1
+
+    def flush(self):
+        for shard, outbox in enumerate(self._outboxes):
+            if outbox:
+                with self._in_flight.get_lock():
+                    self._in_flight.value += len(outbox)
+                self._inboxes[shard].put(outbox)
+                self._outboxes[shard] = []
+
+
+def _run_shard(index, aircraft_class, inboxes, in_flight, results):
+    tower = _ShardTower(index, inboxes, in_flight)
+    while True:
+        batch = inboxes[index].get()
+        if batch is None:
+            break
+        for command in batch:
+            tower.handle(aircraft_class, command)
+        tower.flush()  # Forward replies before this batch stops counting as in flight
+        with in_flight.get_lock():
+            in_flight.value -= len(batch)
+    results.put((index, tower.delivered))
+
+
+# Sharded Mediator: same interface as ControlTower, but aircraft live in worker
+# processes chosen by a hash of Aircraft.name. The Aircraft objects built by the
+# client are handles; the aircraft_class replicas in the workers receive messages.
+class ShardedControlTower(AirTrafficControlTower):
+    def __init__(self, aircraft_class=Aircraft, shards=None, batch_size=1_000):
+        self._shards = shards or os.cpu_count()
+        self._batch_size = batch_size
+        self._inboxes = [mp.Queue() for _ in range(self._shards)]
+        self._buffers = [[] for _ in range(self._shards)]
+        self._in_flight = mp.Value("q", 0)
+        self._results = mp.Queue()
+        self._workers = [
+            mp.Process(
+                target=_run_shard,
+                args=(i, aircraft_class, self._inboxes, self._in_flight, self._results),
+            )
+            for i in range(self._shards)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _post(self, shard, command):
+        buffer = self._buffers[shard]
+        buffer.append(command)
+        if len(buffer) >= self._batch_size:
+            self._flush_shard(shard)
+
+    def _flush_shard(self, shard):
+        buffer = self._buffers[shard]
+        if buffer:
+            with self._in_flight.get_lock():
+                self._in_flight.value += len(buffer)
+            self._inboxes[shard].put(buffer)
+            self._buffers[shard] = []
+
+    def register_aircraft(self, aircraft):
+        self._post(shard_of(aircraft.name, self._shards), ("register", aircraft.name))
+
+    def unregister_aircraft(self, aircraft):
+        self._post(shard_of(aircraft.name, self._shards), ("unregister", aircraft.name))
+
+    def send_message(self, sender, message):
+        for shard in range(self._shards):
+            self._post(shard, ("broadcast", sender.name, message))
+
+    def send_direct(self, sender, recipient_name, message):
+        shard = shard_of(recipient_name, self._shards)
+        self._post(shard, ("direct", sender.name, recipient_name, message))
+
+    def flush(self):
+        # Wait until every shard, including cross-shard replies, has gone quiet
+        for shard in range(self._shards):
+            self._flush_shard(shard)
+        while self._in_flight.value > 0:
+            time.sleep(0.001)
+
+    def close(self):
+        self.flush()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        delivered = dict(self._results.get() for _ in self._workers)
+        for worker in self._workers:
+            worker.join()
+        return delivered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Colleague that answers every direct message, to show cross-shard traffic
+class ReplyingAircraft(Aircraft):
+    def receive_message(self, sender, message):
+        super().receive_message(sender, message)
+        if message.startswith("Request"):
+            self.control_tower.send_direct(self, sender.name, f"Roger, {sender.name}.")
+
+
+# Benchmark Colleague: a fixed amount of CPU work per message, no printing
+class BusyAircraft(Aircraft):
+    def receive_message(self, sender, message):
+        total = 0
+        for i in range(500):
+            total += i
+
+
+def benchmark(aircraft=10_000, messages=200_000):
+    names = [f"Flight {i}" for i in range(aircraft)]
+    targets = [random.choice(names) for _ in range(messages)]
+    cores = os.cpu_count()
+    counts = sorted({n for n in (1, 2, 4, 8, 16) if n <= cores} | {cores})
+    baseline = None
+    print(f"{'shards':>6} {'msg/s':>12} {'speedup':>8}")
+    for shards in counts:
+        tower = ShardedControlTower(BusyAircraft, shards=shards)
+        clients = [Aircraft(name, tower) for name in names]
+        tower.flush()
+
+        start = time.perf_counter()
+        for target in targets:
+            tower.send_direct(clients[0], target, "Position report")
+        tower.flush()
+        elapsed = time.perf_counter() - start
+        delivered = sum(tower.close().values())
+
+        assert delivered == messages
+        baseline = baseline or elapsed
+        print(f"{shards:>6} {messages / elapsed:>12,.0f} {baseline / elapsed:>7.1f}x")
+
+
+# Usage
+if __name__ == "__main__":
+    with ShardedControlTower(ReplyingAircraft, shards=2) as control_tower:
+        aircraft1 = Aircraft("Flight 101", control_tower)
+        aircraft2 = Aircraft("Flight 202", control_tower)
+        aircraft3 = Aircraft("Flight 303", control_tower)
+
+        aircraft1.send_message("Entering airspace, maintaining altitude.")
+        control_tower.flush()
+        control_tower.send_direct(aircraft2, "Flight 303", "Request runway status.")
+        control_tower.flush()
+
+    print(f"\nThroughput on {os.cpu_count()} available cores:\n")
+    benchmark()
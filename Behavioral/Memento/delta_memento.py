@@ -0,0 +1,194 @@
+from contextlib import redirect_stdout
+import io
+import random
+import statistics
+import time
+import tracemalloc
+
+from memento import TextEditor, History
+
+
+# Memento (full): a checkpoint of the whole document. The chunk strings are
+# immutable, so a checkpoint shares them with the editor instead of copying them.
+class CheckpointMemento:
+    __slots__ = ("_leaves", "_tail")
+
+    def __init__(self, leaves, tail):
+        self._leaves = leaves
+        self._tail = tail
+
+    def replay(self):
+        return list(self._leaves), list(self._tail)
+
+    def get_content(self):
+        return "".join(self._leaves) + "".join(self._tail)
+
+
+# Memento (delta): only the text appended since the previous memento
+class DeltaMemento:
+    __slots__ = ("_base", "_ops")
+
+    def __init__(self, base, ops):
+        self._base = base
+        self._ops = ops
+
+    def replay(self):
+        # Walk back to the nearest checkpoint, then re-apply the deltas in order
+        deltas = []
+        memento = self
+        while isinstance(memento, DeltaMemento):
+            deltas.append(memento._ops)
+            memento = memento._base
+        leaves, tail = memento.replay()
+        for ops in reversed(deltas):
+            tail.extend(ops)
+        return leaves, tail
+
+    def get_content(self):
+        leaves, tail = self.replay()
+        return "".join(leaves) + "".join(tail)
+
+
+# Originator: appends go into a chunked buffer of sealed leaves plus a small tail,
+# so write() never copies the document and checkpoints only copy leaf pointers.
+class DeltaTextEditor:
+    LEAF_SIZE = 64 * 1024
+
+    def __init__(self, checkpoint_every=64):
+        self._checkpoint_every = checkpoint_every
+        self._leaves = []  # Sealed chunks of roughly LEAF_SIZE characters
+        self._tail = []  # Recent small appends, sealed into a leaf once large enough
+        self._tail_size = 0
+        self._base = CheckpointMemento((), ())  # Memento the pending ops apply on
+        self._pending = []
+        self._deltas_since_checkpoint = 0
+
+    def write(self, text):
+        self._tail.append(text)
+        self._tail_size += len(text)
+        self._pending.append(text)
+        if self._tail_size >= self.LEAF_SIZE:
+            self._seal()
+
+    def _seal(self):
+        self._leaves.append("".join(self._tail))
+        self._tail = []
+        self._tail_size = 0
+
+    def save(self):
+        if self._deltas_since_checkpoint >= self._checkpoint_every:
+            memento = CheckpointMemento(tuple(self._leaves), tuple(self._tail))
+            self._deltas_since_checkpoint = 0
+        else:
+            memento = DeltaMemento(self._base, tuple(self._pending))
+            self._deltas_since_checkpoint += 1
+        self._base = memento
+        self._pending = []
+        return memento
+
+    def restore(self, memento):
+        self._leaves, self._tail = memento.replay()
+        self._tail_size = sum(map(len, self._tail))
+        if self._tail_size >= self.LEAF_SIZE:
+            self._seal()
+        self._base = memento
+        self._pending = []
+        # A delta chain may have grown past the limit; checkpoint on the next save
+        self._deltas_since_checkpoint = self._checkpoint_every
+
+    def get_content(self):
+        return "".join(self._leaves) + "".join(self._tail)
+
+    def __str__(self):
+        return f"TextEditor: Current content = '{self.get_content()}'"
+
+
+def traced(action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def benchmark(document_size=10 * 2**20, edits=100_000, edit_size=100, baseline_saves=20):
+    document = "x" * document_size
+    edit = "y" * edit_size
+    print(f"{document_size / 2**20:.0f} MB document, {edits:,} edits of {edit_size} chars\n")
+
+    def run_original():
+        editor = TextEditor()
+        history = History()
+        with redirect_stdout(io.StringIO()):  # The original editor prints every step
+            editor.write(document)
+            for _ in range(baseline_saves):
+                editor.write(edit)
+                history.save_state(editor.save())
+        return history
+
+    _, elapsed, memory = traced(run_original)
+    per_save = memory / baseline_saves
+    print(
+        f"original: {per_save / 2**20:8.2f} MB and {elapsed / baseline_saves * 1000:.2f} ms per save "
+        f"(measured over {baseline_saves} saves; {edits:,} saves would need "
+        f"~{per_save * edits / 2**30:,.0f} GB)"
+    )
+
+    def run_delta():
+        editor = DeltaTextEditor()
+        history = []
+        editor.write(document)
+        history.append(editor.save())
+        for _ in range(edits):
+            editor.write(edit)
+            history.append(editor.save())
+        return editor, history
+
+    (editor, history), elapsed, memory = traced(run_delta)
+    print(
+        f"delta:    {memory / 2**20:8.2f} MB total for {edits:,} saves, "
+        f"{elapsed / edits * 1_000_000:.2f} us per write+save"
+    )
+
+    latencies = []
+    for memento in random.sample(history, 200):
+        start = time.perf_counter()
+        editor.restore(memento)
+        latencies.append(time.perf_counter() - start)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")  # Within the observed range
+    print(
+        f"restore:  p50={cuts[49] * 1000:.3f} ms  p99={cuts[98] * 1000:.3f} ms  "
+        f"max={max(latencies) * 1000:.3f} ms"
+    )
+
+    assert editor.get_content() == memento.get_content()
+    assert history[-1].get_content() == document + edit * edits
+
+
+# Client Code
+if __name__ == "__main__":
+    # DeltaTextEditor is a drop-in originator for the History caretaker
+    editor = DeltaTextEditor(checkpoint_every=2)
+    history = History()
+
+    for text in ("Hello, ", "world!", " How are", " you?"):
+        editor.write(text)
+        history.save_state(editor.save())
+    print(editor)
+
+    print("\nUndoing last change:")
+    editor.restore(history.undo())
+    print(editor)
+
+    print("\nUndoing another change:")
+    editor.restore(history.undo())
+    print(editor)
+
+    print("\nRedoing last undo:")
+    editor.restore(history.redo())
+    print(editor)
+
+    print()
+    benchmark()
@@ -0,0 +1,223 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from memento import History, TextEditor, TextMemento
+
+# Record layout (little endian):
+#   header  <IIBQQ: payload length, crc32, kind, a, b
+#   payload
+#   trailer <I: size of the whole record, so the journal can be read back to front
+# MEMENTO records put the memento in slot a of the history; CURSOR records store
+# the undo depth in a and the history length in b after an undo or redo.
+HEADER = struct.Struct("<IIBQQ")
+TRAILER = struct.Struct("<I")
+MEMENTO, CURSOR = 1, 2
+
+
+class CorruptRecord(Exception):
+    pass
+
+
+class JournalFile:
+    def __init__(self, path, fsync=False):
+        self._file = open(path, "a+b")
+        self._fsync = fsync
+        self._map = None
+        self.size = self._file.seek(0, os.SEEK_END)
+        self._recover()
+
+    def append(self, kind, a, b, payload=b""):
+        crc = zlib.crc32(payload, zlib.crc32(struct.pack("<BQQ", kind, a, b)))
+        record = HEADER.pack(len(payload), crc, kind, a, b) + payload
+        record += TRAILER.pack(len(record) + TRAILER.size)
+        offset = self.size
+        self._file.write(record)
+        self._file.flush()  # Survives a process crash
+        if self._fsync:
+            os.fsync(self._file.fileno())  # Survives a power loss
+        self.size += len(record)
+        return offset
+
+    def _view(self, end):
+        if self._map is None or end > len(self._map):
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, offset):
+        view = self._view(offset + HEADER.size)
+        length, crc, kind, a, b = HEADER.unpack_from(view, offset)
+        end = offset + HEADER.size + length
+        if end + TRAILER.size > self.size:
+            raise CorruptRecord(offset)
+        view = self._view(end)
+        payload = view[offset + HEADER.size:end]
+        if zlib.crc32(payload, zlib.crc32(struct.pack("<BQQ", kind, a, b))) != crc:
+            raise CorruptRecord(offset)
+        return kind, a, b, payload, end + TRAILER.size
+
+    def previous(self, end):
+        # Start offset of the record that finishes at `end`
+        (size,) = TRAILER.unpack_from(self._view(end), end - TRAILER.size)
+        return end - size
+
+    def _recover(self):
+        # Only the last record can be torn by a crash; check it and, if it is bad,
+        # find the last good record boundary with a forward scan and cut there.
+        if self.size == 0:
+            return
+        try:
+            if self.read(self.previous(self.size))[4] == self.size:
+                return
+        except (CorruptRecord, struct.error, ValueError):
+            pass
+        good = offset = 0
+        while offset < self.size:
+            try:
+                offset = self.read(offset)[4]
+            except (CorruptRecord, struct.error, ValueError):
+                break
+            good = offset
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.truncate(good)
+        self.size = good
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+# Caretaker backed by the journal. The history is a list of slots with a cursor:
+# the undo stack is slots [0, cursor) and the redo stack is slots [cursor, length).
+# On open only the last record is read; older slots are found on demand by walking
+# the journal backwards, so reopening a huge history costs almost nothing.
+class JournaledHistory(History):
+    def __init__(self, path, fsync=False):
+        super().__init__()
+        self._journal = JournalFile(path, fsync)
+        self._slots = {}  # slot -> record offset, filled lazily
+        self._scan_end = self._journal.size  # Records before this are not scanned yet
+        self._min_slot = None  # Records for slots >= this one were superseded
+        self._cursor = self._length = 0
+        if self._scan_end:
+            self._scan_one()
+
+    def _scan_one(self):
+        start = self._journal.previous(self._scan_end)
+        kind, a, b, _, _ = self._journal.read(start)
+        self._scan_end = start
+        first = self._min_slot is None
+        if kind == CURSOR:
+            if first:
+                self._cursor, self._length, self._min_slot = a, b, b
+        elif first or a < self._min_slot:
+            # A memento is live only if no later record truncated the history below it
+            self._slots[a] = start
+            self._min_slot = a
+            if first:
+                self._cursor = self._length = a + 1
+
+    def _memento(self, slot):
+        while slot not in self._slots:
+            self._scan_one()
+        _, _, _, payload, _ = self._journal.read(self._slots[slot])
+        return TextMemento(payload.decode("utf-8"))
+
+    def save_state(self, memento):
+        slot = self._cursor
+        content = memento.get_content().encode("utf-8")
+        self._slots[slot] = self._journal.append(MEMENTO, slot, 0, content)
+        self._cursor = self._length = slot + 1
+
+    def undo(self):
+        if self._cursor == 0:
+            print("History: Nothing to undo.")
+            return None
+        self._cursor -= 1
+        self._journal.append(CURSOR, self._cursor, self._length)
+        return self._memento(self._cursor)
+
+    def redo(self):
+        if self._cursor == self._length:
+            print("History: Nothing to redo.")
+            return None
+        memento = self._memento(self._cursor)
+        self._cursor += 1
+        self._journal.append(CURSOR, self._cursor, self._length)
+        return memento
+
+    def close(self):
+        self._journal.close()
+
+
+def benchmark(directory, records=1_000_000, memento_size=100):
+    path = os.path.join(directory, "history.journal")
+    content = "x" * memento_size
+
+    history = JournaledHistory(path)
+    start = time.perf_counter()
+    for i in range(records):
+        history.save_state(TextMemento(f"{i}:{content}"))
+    elapsed = time.perf_counter() - start
+    history.close()
+    del history  # Keep freeing the writer's slot index out of the reload timing
+    size = os.path.getsize(path)
+    print(
+        f"write: {records / elapsed:,.0f} records/s, {size / elapsed / 2**20:.1f} MB/s "
+        f"({size / 2**20:.0f} MB journal)"
+    )
+
+    start = time.perf_counter()
+    history = JournaledHistory(path)
+    memento = history.undo()
+    elapsed = time.perf_counter() - start
+    assert memento.get_content().startswith(f"{records - 1}:")
+    print(f"cold start + first undo (lazy): {elapsed * 1000:.3f} ms")
+    history.close()
+
+    # What an eager loader pays: check and parse every record up front
+    start = time.perf_counter()
+    journal = JournalFile(path)
+    offset = 0
+    while offset < journal.size:
+        offset = journal.read(offset)[4]
+    elapsed = time.perf_counter() - start
+    journal.close()
+    print(f"cold start (eager full parse):  {elapsed * 1000:.3f} ms")
+
+
+# Client Code
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "editor.journal")
+
+        editor = TextEditor()
+        history = JournaledHistory(path)
+        for text in ("Hello, ", "world!", " How are you?"):
+            editor.write(text)
+            history.save_state(editor.save())
+        editor.restore(history.undo())
+        editor.restore(history.undo())
+        history.close()
+
+        # Simulate a crash in the middle of writing a record
+        with open(path, "ab") as journal:
+            journal.write(b"\x07\x00\x00")
+
+        print("\nReopening after the crash:")
+        history = JournaledHistory(path)
+        editor.restore(history.redo())  # The redo stack survived the restart
+        editor.restore(history.undo())
+        editor.restore(history.undo())
+        history.close()
+
+        print()
+        benchmark(directory)
@@ -0,0 +1,212 @@
+from collections import Counter
+import mmap
+import os
+import pickle
+import random
+import string
+import tempfile
+import time
+import zlib
+
+from memento import History, TextEditor, TextMemento
+
+
+# Cold tier: an append-only file that is read back through mmap
+class SpillFile:
+    def __init__(self, path):
+        self._file = open(path, "a+b")
+        self._size = self._file.seek(0, os.SEEK_END)
+        self._map = None
+
+    def append(self, data):
+        offset = self._size
+        self._file.write(data)
+        self._size += len(data)
+        return offset
+
+    def read(self, offset, length):
+        if self._map is None or offset + length > len(self._map):
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:offset + length]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+# Caretaker with a memory budget. The undo stack is split into contiguous tiers,
+# oldest first: cold (spilled to disk) | warm (zlib-compressed) | hot (memento objects).
+# Saving pushes a hot entry; when a tier is over budget its oldest entries are demoted,
+# and entries that fit nowhere are evicted.
+class TieredHistory(History):
+    def __init__(
+        self,
+        max_hot_bytes=64 * 2**20,
+        max_warm_bytes=64 * 2**20,
+        max_entries=None,
+        spill_path=None,
+        sizeof=lambda memento: len(memento.get_content()),
+    ):
+        super().__init__()
+        self._max_hot_bytes = max_hot_bytes
+        self._max_warm_bytes = max_warm_bytes  # 0 disables the zlib tier
+        self._max_entries = max_entries
+        self._spill = SpillFile(spill_path) if spill_path else None
+        self._sizeof = sizeof
+        self._warm_start = 0  # Index of the first warm entry
+        self._hot_start = 0  # Index of the first hot entry
+        self._bytes = Counter()
+        self._hits = Counter()
+        self._latency = Counter()
+        self._evicted = 0
+
+    def save_state(self, memento):
+        size = self._sizeof(memento)
+        self._undo_stack.append(("hot", memento, size))
+        self._bytes["hot"] += size
+        self._redo_stack.clear()  # Clear redo stack when a new state is saved
+        self._enforce_budget()
+
+    def undo(self):
+        if not self._undo_stack:
+            return None
+        start = time.perf_counter()
+        tier, payload, size = self._undo_stack.pop()
+        self._bytes[tier] -= size
+        self._hot_start = min(self._hot_start, len(self._undo_stack))
+        self._warm_start = min(self._warm_start, len(self._undo_stack))
+        memento = self._load(tier, payload)
+        self._redo_stack.append(memento)
+        self._hits[tier] += 1
+        self._latency[tier] += time.perf_counter() - start
+        return memento
+
+    def redo(self):
+        if not self._redo_stack:
+            return None
+        memento = self._redo_stack.pop()
+        size = self._sizeof(memento)
+        self._undo_stack.append(("hot", memento, size))
+        self._bytes["hot"] += size
+        self._enforce_budget()
+        return memento
+
+    def _enforce_budget(self):
+        stack = self._undo_stack
+        if self._max_entries is not None and len(stack) > self._max_entries:
+            self._evict(len(stack) - self._max_entries)
+        # Demote the oldest hot entries
+        while self._bytes["hot"] > self._max_hot_bytes and self._hot_start < len(stack) - 1:
+            _, memento, size = stack[self._hot_start]
+            data = pickle.dumps(memento, pickle.HIGHEST_PROTOCOL)
+            self._bytes["hot"] -= size
+            if self._max_warm_bytes:
+                data = zlib.compress(data, 1)
+                stack[self._hot_start] = ("warm", data, len(data))
+                self._bytes["warm"] += len(data)
+            else:
+                stack[self._hot_start] = self._to_cold(data)
+                self._warm_start += 1  # The warm tier is empty, so cold grows directly
+            self._hot_start += 1
+        # Demote the oldest warm entries
+        while self._bytes["warm"] > self._max_warm_bytes and self._warm_start < self._hot_start:
+            _, data, size = stack[self._warm_start]
+            self._bytes["warm"] -= size
+            stack[self._warm_start] = self._to_cold(data)
+            self._warm_start += 1
+        # Without a spill file, cold entries are simply forgotten
+        if self._spill is None and self._warm_start:
+            self._evict(self._warm_start)
+
+    def _to_cold(self, data):
+        if self._spill is None:
+            return ("cold", None, 0)
+        offset = self._spill.append(data)
+        self._bytes["cold"] += len(data)
+        return ("cold", (offset, len(data)), len(data))
+
+    def _evict(self, count):
+        for tier, _, size in self._undo_stack[:count]:
+            self._bytes[tier] -= size
+        del self._undo_stack[:count]
+        self._warm_start = max(self._warm_start - count, 0)
+        self._hot_start = max(self._hot_start - count, 0)
+        self._evicted += count
+
+    def _load(self, tier, payload):
+        if tier == "hot":
+            return payload
+        if tier == "cold":
+            payload = self._spill.read(*payload)
+        if self._max_warm_bytes:
+            payload = zlib.decompress(payload)
+        return pickle.loads(payload)
+
+    def stats(self):
+        undos = sum(self._hits.values())
+        return {
+            "entries": {
+                "cold": self._warm_start,
+                "warm": self._hot_start - self._warm_start,
+                "hot": len(self._undo_stack) - self._hot_start,
+                "redo": len(self._redo_stack),
+            },
+            "bytes": dict(self._bytes),
+            "evicted": self._evicted,
+            "hit_rate": {tier: hits / undos for tier, hits in self._hits.items()},
+            "undo_latency_us": {
+                tier: self._latency[tier] / hits * 1_000_000 for tier, hits in self._hits.items()
+            },
+        }
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+
+
+def benchmark(directory, mementos=20_000, memento_size=10_000, undos=20_000):
+    words = ["".join(random.choices(string.ascii_lowercase, k=6)) for _ in range(500)]
+    text = " ".join(random.choices(words, k=memento_size // 7))
+
+    history = TieredHistory(
+        max_hot_bytes=16 * 2**20,
+        max_warm_bytes=16 * 2**20,
+        spill_path=os.path.join(directory, "history.spill"),
+    )
+    start = time.perf_counter()
+    for i in range(mementos):
+        history.save_state(TextMemento(f"{i}:{text}"))
+    elapsed = time.perf_counter() - start
+    print(f"{mementos:,} mementos of ~{memento_size / 1000:.0f} KB saved in {elapsed:.2f} s")
+    print(f"after saving: {history.stats()}")
+
+    for i in reversed(range(mementos - undos, mementos)):
+        assert history.undo().get_content().startswith(f"{i}:")
+    print(f"after {undos:,} undos: {history.stats()}")
+    history.close()
+
+
+# Client Code
+if __name__ == "__main__":
+    editor = TextEditor()
+    history = TieredHistory(max_entries=2)
+
+    editor.write("Hello, ")
+    history.save_state(editor.save())
+    editor.write("world!")
+    history.save_state(editor.save())
+    editor.write(" How are you?")
+    history.save_state(editor.save())
+    print(f"\n{history.stats()}")
+
+    editor.restore(history.undo())
+    editor.restore(history.undo())
+    print(history.undo())  # The oldest state was evicted by max_entries=2
+
+    print()
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark(directory)
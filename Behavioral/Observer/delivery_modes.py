@@ -0,0 +1,264 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import queue
+import statistics
+import threading
+import time
+import weakref
+
+from observer import ConcreteSubject, Observer
+
+
+# Delivery Modes: how a subject hands one message to its observers
+class SyncDelivery:
+    # The original behaviour: every observer runs on the caller's thread, in order
+    def __init__(self):
+        self.stats = Counter()
+
+    def deliver(self, observers, message):
+        for observer in observers:
+            observer.update(message)
+            self.stats["delivered"] += 1
+
+    def forget(self, observer):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Mailbox:
+    def __init__(self, max_pending):
+        self.messages = queue.Queue(maxsize=max_pending)
+        self.scheduled = False
+
+
+class ThreadPoolDelivery:
+    # Every observer gets a bounded mailbox drained by at most one pool worker at a
+    # time, so a slow observer only delays its own messages, which stay in order.
+    # With a timeout, messages that waited longer are dropped and counted as "expired".
+    def __init__(self, max_workers=8, timeout=None, max_pending=1_000):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._timeout = timeout
+        self._max_pending = max_pending
+        # Weak keys: a mailbox never keeps its observer alive. A drain in progress
+        # holds the observer only until the mailbox is empty.
+        self._mailboxes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def deliver(self, observers, message):
+        now = time.monotonic()
+        for observer in observers:
+            mailbox = self._mailboxes.get(observer)
+            if mailbox is None:
+                mailbox = self._mailboxes.setdefault(observer, _Mailbox(self._max_pending))
+            mailbox.messages.put((now, message))  # Blocks when full: backpressure
+            with self._lock:
+                if not mailbox.scheduled:
+                    mailbox.scheduled = True
+                    self._pool.submit(self._drain, observer, mailbox)
+
+    def _drain(self, observer, mailbox):
+        while True:
+            with self._lock:
+                if mailbox.messages.empty():
+                    mailbox.scheduled = False
+                    return
+            queued_at, message = mailbox.messages.get_nowait()
+            # Threads cannot be interrupted, so the timeout expires messages that
+            # waited too long and counts updates that ran too long.
+            if self._timeout is not None and time.monotonic() - queued_at > self._timeout:
+                self._count("expired")
+                continue
+            start = time.monotonic()
+            try:
+                observer.update(message)
+                self._count("delivered")
+            except Exception:
+                self._count("errors")
+            if self._timeout is not None and time.monotonic() - start > self._timeout:
+                self._count("timeouts")
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def forget(self, observer):
+        # Called on detach; messages already queued are still delivered
+        self._mailboxes.pop(observer, None)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+class AsyncioDelivery:
+    # Every observer gets a bounded asyncio.Queue and its own consumer task;
+    # `async def update` calls are cancelled once they exceed the timeout.
+    def __init__(self, timeout=0.05, max_pending=1_000):
+        self._timeout = timeout
+        self._max_pending = max_pending
+        self._queues = weakref.WeakKeyDictionary()  # observer -> (mailbox, consumer task)
+        self._consumers = set()
+        self.stats = Counter()
+
+    async def deliver(self, observers, message):
+        for observer in observers:
+            entry = self._queues.get(observer)
+            if entry is None:
+                mailbox = asyncio.Queue(self._max_pending)
+                # The consumer only holds a weak reference, and is cancelled once the
+                # observer is collected
+                consumer = asyncio.create_task(self._consume(weakref.ref(observer), mailbox))
+                self._consumers.add(consumer)
+                consumer.add_done_callback(self._consumers.discard)
+                weakref.finalize(observer, consumer.cancel)
+                entry = self._queues[observer] = (mailbox, consumer)
+            await entry[0].put(message)  # Waits when full: backpressure
+
+    async def _consume(self, reference, mailbox):
+        while True:
+            message = await mailbox.get()
+            try:
+                if not await self._handle(reference(), message):
+                    return
+            finally:
+                mailbox.task_done()
+
+    async def _handle(self, observer, message):
+        if observer is None:  # Collected while the message was queued
+            return False
+        try:
+            result = observer.update(message)
+            if asyncio.iscoroutine(result):
+                await asyncio.wait_for(result, self._timeout)
+            self.stats["delivered"] += 1
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+        except Exception:
+            self.stats["errors"] += 1
+        return True
+
+    def forget(self, observer):
+        # Called on detach: drops the mailbox and stops its consumer
+        entry = self._queues.pop(observer, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    async def close(self):
+        for mailbox, _ in list(self._queues.values()):
+            await mailbox.join()
+        consumers = list(self._consumers)
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+
+# Subjects with a selectable delivery mode
+class DeliverySubject(ConcreteSubject):
+    def __init__(self, delivery=None, weak=False):
+        super().__init__(weak)
+        self.delivery = delivery or SyncDelivery()
+
+    def detach(self, observer):
+        super().detach(observer)
+        self.delivery.forget(observer)
+
+    def notify(self, message):
+        self.delivery.deliver(list(self._observers), message)
+
+
+class AsyncConcreteSubject(ConcreteSubject):
+    def __init__(self, delivery=None, weak=False):
+        super().__init__(weak)
+        self.delivery = delivery or AsyncioDelivery()
+
+    def detach(self, observer):
+        super().detach(observer)
+        self.delivery.forget(observer)
+
+    async def notify(self, message):
+        await self.delivery.deliver(list(self._observers), message)
+
+    async def set_state(self, state):
+        self._state = state
+        await self.notify(f"State updated to: {self._state}")
+
+
+# Benchmark Observers
+class FastObserver(Observer):
+    def update(self, message):
+        pass
+
+
+class SlowObserver(Observer):
+    def __init__(self, delay):
+        self._delay = delay
+
+    def update(self, message):
+        time.sleep(self._delay)
+
+
+class AsyncFastObserver(Observer):
+    async def update(self, message):
+        pass
+
+
+class AsyncSlowObserver(Observer):
+    def __init__(self, delay):
+        self._delay = delay
+
+    async def update(self, message):
+        await asyncio.sleep(self._delay)
+
+
+def percentiles(latencies):
+    # Inclusive: the cut points stay within the observed latencies
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(latencies)}
+
+
+def print_row(name, latencies, stats):
+    row = "  ".join(f"{k}={v * 1000:8.3f}ms" for k, v in percentiles(latencies).items())
+    print(f"{name:<12} {row}  {dict(stats)}")
+
+
+def benchmark(observers=20, calls=100, delay=0.02, timeout=0.01):
+    for name, delivery in (
+        ("sync", SyncDelivery()),
+        ("thread pool", ThreadPoolDelivery(timeout=timeout)),
+    ):
+        subject = DeliverySubject(delivery)
+        for _ in range(observers - 1):
+            subject.attach(FastObserver())
+        subject.attach(SlowObserver(delay))
+        latencies = []
+        for i in range(calls):
+            start = time.perf_counter()
+            subject.set_state(i)
+            latencies.append(time.perf_counter() - start)
+        delivery.close()
+        print_row(name, latencies, delivery.stats)
+
+    async def run_asyncio():
+        delivery = AsyncioDelivery(timeout=timeout)
+        subject = AsyncConcreteSubject(delivery)
+        for _ in range(observers - 1):
+            subject.attach(AsyncFastObserver())
+        subject.attach(AsyncSlowObserver(delay))
+        latencies = []
+        for i in range(calls):
+            start = time.perf_counter()
+            await subject.set_state(i)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)  # Let the consumers run between state changes
+        await delivery.close()
+        print_row("asyncio", latencies, delivery.stats)
+
+    asyncio.run(run_asyncio())
+
+
+if __name__ == "__main__":
+    print("set_state latency with one observer sleeping 20 ms, timeout 10 ms:\n")
+    benchmark()
@@ -1,29 +1,44 @@
+import weakref
+
+
 # Step 1: Define the Observer interface
 class Observer:
     def update(self, message):
         pass
 
+    def update_batch(self, messages):
+        for message in messages:
+            self.update(message)
+
 
 # Step 2: Define the Subject
 class Subject:
-    def __init__(self):
-        self._observers = []
+    def __init__(self, weak=False):
+        # Insertion-ordered set: O(1) detach. The weak variant forgets observers
+        # as soon as the rest of the program drops them.
+        self._observers = weakref.WeakKeyDictionary() if weak else {}
 
     def attach(self, observer):
-        self._observers.append(observer)
+        self._observers[observer] = None
 
     def detach(self, observer):
-        self._observers.remove(observer)
+        del self._observers[observer]
 
     def notify(self, message):
-        for observer in self._observers:
+        # Iterate over a snapshot, so update() may attach or detach observers
+        for observer in tuple(self._observers):
             observer.update(message)
 
+    def notify_batch(self, messages):
+        messages = list(messages)
+        for observer in tuple(self._observers):
+            observer.update_batch(messages)
+
 
 # Step 3: Create ConcreteSubject
 class ConcreteSubject(Subject):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, weak=False):
+        super().__init__(weak)
         self._state = None
 
     def set_state(self, state):
@@ -0,0 +1,138 @@
+import random
+import time
+import weakref
+
+from observer import Observer, Subject
+
+
+# Topic Subject: observers subscribe to topics (or predicates) instead of every message
+class TopicSubject(Subject):
+    def __init__(self, weak=False):
+        super().__init__(weak)  # self._observers holds the wildcard subscribers
+        self._registry = weakref.WeakKeyDictionary if weak else dict
+        self._topics = {}  # topic -> insertion-ordered set of observers
+        self._predicates = self._registry()  # observer -> predicate(topic, message)
+
+    def attach(self, observer, topic=None, predicate=None):
+        if predicate is not None:
+            self._predicates[observer] = predicate
+        elif topic is not None:
+            subscribers = self._topics.get(topic)
+            if subscribers is None:
+                subscribers = self._topics[topic] = self._registry()
+            subscribers[observer] = None
+        else:
+            super().attach(observer)
+
+    def detach(self, observer, topic=None):
+        if topic is not None:
+            subscribers = self._topics[topic]
+            del subscribers[observer]
+            if not subscribers:
+                del self._topics[topic]
+        elif observer in self._predicates:
+            del self._predicates[observer]
+        else:
+            super().detach(observer)
+
+    def _interested(self, topic, message):
+        # A snapshot taken before any update() runs, so observers may attach or detach
+        interested = list(self._observers)
+        interested.extend(self._topics.get(topic, ()))
+        interested.extend(
+            observer for observer, predicate in tuple(self._predicates.items()) if predicate(topic, message)
+        )
+        return interested
+
+    def notify(self, message, topic=None):
+        for observer in self._interested(topic, message):
+            observer.update(message)
+
+    def notify_batch(self, messages):
+        # messages: iterable of (topic, message); one update_batch call per observer
+        pending = {}
+        for topic, message in messages:
+            for observer in self._interested(topic, message):
+                pending.setdefault(observer, []).append(message)
+        for observer, batch in pending.items():
+            observer.update_batch(batch)
+
+
+class PrintingObserver(Observer):
+    def __init__(self, name):
+        self._name = name
+
+    def update(self, message):
+        print(f"{self._name} received message: {message}")
+
+
+# Benchmark Observers
+class CountingObserver(Observer):
+    def __init__(self):
+        self.count = 0
+
+    def update(self, message):
+        self.count += 1
+
+    def update_batch(self, messages):
+        self.count += len(messages)
+
+
+class FilteringObserver(CountingObserver):
+    # What observers must do with a plain Subject: receive everything, ignore most
+    def __init__(self, topic):
+        super().__init__()
+        self._topic = topic
+
+    def update(self, message):
+        if message[0] == self._topic:
+            self.count += 1
+
+
+def benchmark(observers=10_000, topics=100, messages=1_000):
+    stream = [(random.randrange(topics), f"event {i}") for i in range(messages)]
+
+    plain = Subject()
+    for i in range(observers):
+        plain.attach(FilteringObserver(i % topics))
+    start = time.perf_counter()
+    for topic, message in stream:
+        plain.notify((topic, message))
+    plain_time = time.perf_counter() - start
+
+    indexed = TopicSubject()
+    for i in range(observers):
+        indexed.attach(CountingObserver(), topic=i % topics)
+    start = time.perf_counter()
+    for topic, message in stream:
+        indexed.notify(message, topic=topic)
+    indexed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed.notify_batch(stream)
+    batch_time = time.perf_counter() - start
+
+    print(f"{observers:,} observers, {topics} topics, {messages:,} messages")
+    print(f"{'plain Subject (observers filter)':<36} {messages / plain_time:>12,.0f} msg/s")
+    print(f"{'TopicSubject.notify':<36} {messages / indexed_time:>12,.0f} msg/s")
+    print(f"{'TopicSubject.notify_batch':<36} {messages / batch_time:>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    subject = TopicSubject()
+    weather = PrintingObserver("Weather desk")
+    sports = PrintingObserver("Sports desk")
+    alerts = PrintingObserver("Alerts desk")
+
+    subject.attach(weather, topic="weather")
+    subject.attach(sports, topic="sports")
+    subject.attach(alerts, predicate=lambda topic, message: "storm" in message)
+
+    subject.notify("Sunny all week", topic="weather")
+    subject.notify("Home team wins", topic="sports")
+    subject.notify("storm warning issued", topic="weather")
+
+    subject.notify_batch([("sports", "Match delayed"), ("sports", "Match resumed")])
+
+    print()
+    benchmark()
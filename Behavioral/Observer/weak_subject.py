@@ -0,0 +1,105 @@
+import gc
+import inspect
+import weakref
+
+from observer import ConcreteObserver, ConcreteSubject
+
+
+# Weak Callback Subject: observers can also be plain callbacks; bound methods are
+# held through WeakMethod so subscribing does not keep their object alive.
+class WeakCallbackSubject(ConcreteSubject):
+    def __init__(self):
+        super().__init__(weak=True)
+        self._callbacks = {}
+
+    def subscribe(self, callback):
+        if inspect.ismethod(callback):
+            key = weakref.WeakMethod(callback, self._forget)
+        else:
+            key = callback  # Plain functions, lambdas and builtins are held strongly
+        self._callbacks[key] = None
+        return key
+
+    def unsubscribe(self, key):
+        self._callbacks.pop(key, None)
+
+    def _forget(self, dead_method):
+        self._callbacks.pop(dead_method, None)
+
+    def notify(self, message):
+        super().notify(message)
+        for key in list(self._callbacks):
+            callback = key() if isinstance(key, weakref.WeakMethod) else key
+            if callback is not None:
+                callback(message)
+
+    def __len__(self):
+        return len(self._observers) + len(self._callbacks)
+
+
+class Display:
+    def __init__(self, name):
+        self._name = name
+
+    def show(self, message):
+        print(f"{self._name} shows: {message}")
+
+
+def rss_mb():
+    # Resident set size on Linux; None where /proc is not available
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return pages * 4096 / 2**20
+
+
+def report(cycle, subject):
+    gc.collect()
+    rss = rss_mb()
+    shown = f"{rss:8.1f} MB" if rss is not None else "     n/a"
+    print(f"{cycle:>10,} cycles  registered={len(subject._observers):>9,}  rss={shown}")
+    return rss
+
+
+def benchmark(cycles=1_000_000, report_every=200_000):
+    print("Weak registry (observer and bound-method callback dropped every cycle):")
+    subject = WeakCallbackSubject()
+    samples = []
+    for i in range(1, cycles + 1):
+        subject.attach(ConcreteObserver(f"observer {i}"))
+        subject.subscribe(Display(f"display {i}").show)
+        if i % report_every == 0:
+            samples.append(report(i, subject))
+    assert len(subject) == 0, "dead observers are still registered"
+    if samples[0] is not None:
+        growth = samples[-1] - samples[0]
+        assert growth < 5, f"RSS grew by {growth:.1f} MB"
+
+    print("\nStrong registry (observer dropped every cycle, detach() forgotten):")
+    subject = ConcreteSubject()
+    for i in range(1, cycles + 1):
+        subject.attach(ConcreteObserver(f"observer {i}"))
+        if i % report_every == 0:
+            report(i, subject)
+
+
+if __name__ == "__main__":
+    subject = WeakCallbackSubject()
+
+    observer = ConcreteObserver("Observer 1")
+    display = Display("Lobby display")
+    subject.attach(observer)
+    subject.subscribe(display.show)
+
+    subject.set_state("State 1")  # Both receive the message
+
+    # Drop the only references; no detach() call is needed
+    del observer, display
+    gc.collect()
+    subject.set_state("State 2")  # Nobody is left to notify
+    print(f"Registered after drop: {len(subject)}")
+
+    print()
+    benchmark()
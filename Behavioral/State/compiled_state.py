@@ -0,0 +1,154 @@
+from contextlib import redirect_stdout
+import io
+import os
+import time
+import tracemalloc
+
+from state import (
+    VendingMachine,
+    NoCoinState,
+    HasCoinState,
+    DispensingState,
+    OutOfStockState,
+)
+
+EVENTS = ("insert_coin", "select_item", "dispense_item")
+STATES = (NoCoinState, HasCoinState, DispensingState, OutOfStockState)
+
+# Stateless state flyweights: one shared instance per state class
+STATE_FLYWEIGHTS = tuple(state_class() for state_class in STATES)
+
+# The state classes only ever compare item_count with 0 (before or after one
+# decrement), so "empty", "last item" and "more" cover every branch they can take.
+STOCK_CLASSES = 3
+
+
+def stock_class(item_count):
+    return item_count if item_count < 2 else 2
+
+
+# Records what a state method does to the machine instead of doing it
+class _Probe:
+    __slots__ = ("item_count", "next_state")
+
+    def __init__(self, item_count):
+        self.item_count = item_count
+        self.next_state = None
+
+    def set_state(self, state):
+        self.next_state = state
+
+
+def compile_table(states=STATES, events=EVENTS):
+    # table[state][event][stock class] -> (message, item_count delta, next state)
+    codes = {state_class: code for code, state_class in enumerate(states)}
+    table = []
+    for code, state_class in enumerate(states):
+        rows = []
+        for event in events:
+            cells = []
+            for stock in range(STOCK_CLASSES):
+                probe = _Probe(stock)
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    getattr(state_class(), event)(probe)
+                next_state = codes[type(probe.next_state)] if probe.next_state else code
+                cells.append((output.getvalue().rstrip("\n"), probe.item_count - stock, next_state))
+            rows.append(tuple(cells))
+        table.append(tuple(rows))
+    return tuple(table)
+
+
+TABLE = compile_table()
+INSERT_COIN, SELECT_ITEM, DISPENSE_ITEM = range(len(EVENTS))
+
+
+# Context: two slots, no per-instance dict, no per-transition allocation
+class CompiledVendingMachine:
+    __slots__ = ("item_count", "state")
+
+    emit = staticmethod(print)  # Replace to redirect or silence the messages
+
+    def __init__(self, item_count):
+        self.item_count = item_count
+        self.state = 0  # NoCoinState
+
+    def fire(self, event):
+        message, delta, next_state = TABLE[self.state][event][stock_class(self.item_count)]
+        if message:
+            self.emit(message)
+        self.item_count += delta
+        self.state = next_state
+
+    def insert_coin(self):
+        self.fire(INSERT_COIN)
+
+    def select_item(self):
+        self.fire(SELECT_ITEM)
+
+    def dispense_item(self):
+        self.fire(DISPENSE_ITEM)
+
+    @property
+    def current_state(self):
+        return STATE_FLYWEIGHTS[self.state]
+
+
+def memory_per_machine(factory, machines):
+    tracemalloc.start()
+    fleet = [factory(5) for _ in range(machines)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del fleet
+    return current / machines
+
+
+def transitions_per_second(factory, machines, rounds):
+    fleet = [factory(rounds) for _ in range(machines)]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for machine in fleet:
+            machine.insert_coin()
+            machine.select_item()
+            machine.dispense_item()
+    return machines * rounds * 3 / (time.perf_counter() - start)
+
+
+def benchmark(machines=100_000, rounds=5):
+    print(f"{'design':<28} {'transitions/s':>14} {'bytes/machine':>14}")
+    # Both designs print every transition
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        original = transitions_per_second(VendingMachine, machines, rounds)
+        compiled = transitions_per_second(CompiledVendingMachine, machines, rounds)
+    print(f"{'original (objects)':<28} {original:>14,.0f} "
+          f"{memory_per_machine(VendingMachine, machines):>14,.0f}")
+    print(f"{'compiled table':<28} {compiled:>14,.0f} "
+          f"{memory_per_machine(CompiledVendingMachine, machines):>14,.0f}")
+
+    class SilentMachine(CompiledVendingMachine):
+        __slots__ = ()
+        emit = staticmethod(lambda message: None)
+
+    silent = transitions_per_second(SilentMachine, machines, rounds)
+    print(f"{'compiled table (silent)':<28} {silent:>14,.0f}")
+
+
+# Client code
+if __name__ == "__main__":
+    vending_machine = CompiledVendingMachine(item_count=2)
+
+    vending_machine.insert_coin()  # Coin inserted.
+    vending_machine.insert_coin()  # Coin already inserted.
+    vending_machine.select_item()  # Item selected. Preparing to dispense.
+    vending_machine.insert_coin()  # Please wait, item is being dispensed.
+    vending_machine.dispense_item()  # Item dispensed.
+
+    vending_machine.insert_coin()  # Coin inserted.
+    vending_machine.select_item()  # Item selected. Preparing to dispense.
+    vending_machine.dispense_item()  # Item dispensed.
+
+    vending_machine.insert_coin()  # Machine is out of stock. Cannot accept coins.
+    print(type(vending_machine.current_state).__name__)  # OutOfStockState
+
+    print()
+    benchmark()
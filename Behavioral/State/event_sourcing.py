@@ -0,0 +1,218 @@
+import json
+import os
+import random
+import struct
+import tempfile
+import time
+
+from compiled_state import (
+    CompiledVendingMachine,
+    STATES,
+    TABLE,
+    INSERT_COIN,
+    SELECT_ITEM,
+    DISPENSE_ITEM,
+    stock_class,
+)
+
+# Event file: fixed-size records of (machine id, event code, argument)
+RECORD = struct.Struct("<IBi")
+CREATED = 255  # The argument is the initial item_count
+
+
+class EventLog:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "ab")
+        # Cut a torn final record, from a crash in the middle of a write, so that
+        # appends start on a record boundary again
+        size = self._file.seek(0, os.SEEK_END)
+        self._file.truncate(size - size % RECORD.size)
+
+    @property
+    def offset(self):
+        return self._file.tell()
+
+    def append(self, machine_id, event, argument=0):
+        self._file.write(RECORD.pack(machine_id, event, argument))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# Latest (log offset, state, item_count) of each machine, written atomically
+class SnapshotStore:
+    def __init__(self, path):
+        self.path = path
+        self._snapshots = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                self._snapshots = {int(k): tuple(v) for k, v in json.load(file).items()}
+
+    def record(self, machine_id, offset, state, item_count):
+        self._snapshots[machine_id] = (offset, state, item_count)
+
+    def get(self, machine_id):
+        return self._snapshots.get(machine_id)
+
+    def save(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(self._snapshots, file)
+        os.replace(temporary, self.path)
+
+
+# Replay pipeline: every stage is a generator, so only one chunk of the event
+# file is in memory at a time
+def read_records(path, start=0, chunk_records=65_536):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while True:
+            chunk = file.read(RECORD.size * chunk_records)
+            if not chunk:
+                return
+            # A torn final record, from a crash in the middle of a write, is skipped
+            yield from RECORD.iter_unpack(chunk[: len(chunk) - len(chunk) % RECORD.size])
+
+
+def for_machine(machine_id, records):
+    return (record for record in records if record[0] == machine_id)
+
+
+def replay(records, machines=None):
+    # Folds records into {machine id: [state, item_count]} without printing anything
+    machines = {} if machines is None else machines
+    for machine_id, event, argument in records:
+        if event == CREATED:
+            machines[machine_id] = [0, argument]
+            continue
+        machine = machines[machine_id]
+        _, delta, machine[0] = TABLE[machine[0]][event][stock_class(machine[1])]
+        machine[1] += delta
+    return machines
+
+
+# Context that records every event it handles and snapshots itself periodically
+class EventSourcedVendingMachine(CompiledVendingMachine):
+    __slots__ = ("machine_id", "_log", "_snapshots", "_snapshot_every", "_since_snapshot")
+
+    def __init__(self, machine_id, item_count, log, snapshots, snapshot_every=100):
+        self._attach(machine_id, item_count, log, snapshots, snapshot_every)
+        log.append(machine_id, CREATED, item_count)
+
+    def _attach(self, machine_id, item_count, log, snapshots, snapshot_every):
+        # __init__ without logging the creation, which a rebuilt machine already has
+        super().__init__(item_count)
+        self.machine_id = machine_id
+        self._log = log
+        self._snapshots = snapshots
+        self._snapshot_every = snapshot_every
+        self._since_snapshot = 0
+
+    def fire(self, event):
+        super().fire(event)
+        self._log.append(self.machine_id, event)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self._snapshot_every:
+            self._snapshots.record(self.machine_id, self._log.offset, self.state, self.item_count)
+            self._since_snapshot = 0
+
+    @classmethod
+    def rebuild(cls, machine_id, log, snapshots, snapshot_every=100):
+        # Start from the latest snapshot and replay only the events logged after it
+        log.flush()
+        snapshot = snapshots.get(machine_id)
+        if snapshot is None:
+            offset, machines = 0, {}
+        else:
+            offset, state, item_count = snapshot
+            machines = {machine_id: [state, item_count]}
+        records = for_machine(machine_id, read_records(log.path, offset))
+        state, item_count = replay(records, machines)[machine_id]
+        machine = cls.__new__(cls)
+        machine._attach(machine_id, item_count, log, snapshots, snapshot_every)
+        machine.state = state
+        return machine
+
+
+def check_crash(directory):
+    # A crash in the middle of a write, then a restart that keeps appending
+    path = os.path.join(directory, "crash.bin")
+    log = EventLog(path)
+    log.append(1, CREATED, 2)
+    log.append(1, INSERT_COIN)
+    log.close()
+    with open(path, "ab") as file:
+        file.write(RECORD.pack(1, SELECT_ITEM, 0)[:5])  # Torn record
+    log = EventLog(path)
+    log.append(1, SELECT_ITEM)
+    log.close()
+    assert list(read_records(path)) == [(1, CREATED, 2), (1, INSERT_COIN, 0), (1, SELECT_ITEM, 0)]
+    assert replay(read_records(path)) == {1: [2, 2]}  # DispensingState, before dispensing
+    print("Crash: the torn record is dropped and later appends replay correctly.")
+
+
+def benchmark(directory, machines=100_000, events=5_000_000, snapshot_every=10):
+    log = EventLog(os.path.join(directory, "events.bin"))
+    snapshots = SnapshotStore(os.path.join(directory, "snapshots.json"))
+    class SilentMachine(EventSourcedVendingMachine):
+        __slots__ = ()
+        emit = staticmethod(lambda message: None)  # Time the recording, not the printing
+
+    fleet = [
+        SilentMachine(i, 50, log, snapshots, snapshot_every)
+        for i in range(machines)
+    ]
+    cycle = (INSERT_COIN, SELECT_ITEM, DISPENSE_ITEM)
+
+    start = time.perf_counter()
+    for i in range(events):
+        fleet[random.randrange(machines)].fire(cycle[i % 3])
+    log.flush()
+    elapsed = time.perf_counter() - start
+    print(f"record: {events / elapsed:,.0f} events/s into a {log.offset / 2**20:.0f} MB event file")
+
+    start = time.perf_counter()
+    audited = replay(read_records(log.path))
+    elapsed = time.perf_counter() - start
+    total = events + machines
+    print(f"replay: {total / elapsed:,.0f} events/s for a full audit of {machines:,} machines")
+    for machine in fleet:
+        assert audited[machine.machine_id] == [machine.state, machine.item_count]
+
+    machine = fleet[-1]
+    for label, store in (("from scratch", SnapshotStore(snapshots.path + ".none")),
+                         ("from snapshot", snapshots)):
+        start = time.perf_counter()
+        rebuilt = EventSourcedVendingMachine.rebuild(machine.machine_id, log, store)
+        elapsed = time.perf_counter() - start
+        assert (rebuilt.state, rebuilt.item_count) == (machine.state, machine.item_count)
+        print(f"rebuild one machine {label}: {elapsed * 1000:.1f} ms")
+    log.close()
+
+
+# Client code
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        log = EventLog(os.path.join(directory, "events.bin"))
+        snapshots = SnapshotStore(os.path.join(directory, "snapshots.json"))
+
+        vending_machine = EventSourcedVendingMachine(1, 2, log, snapshots, snapshot_every=2)
+        vending_machine.insert_coin()  # Coin inserted.
+        vending_machine.select_item()  # Item selected. Preparing to dispense.
+        vending_machine.dispense_item()  # Item dispensed.
+        vending_machine.insert_coin()  # Coin inserted.
+        snapshots.save()
+
+        # Simulate a restart: rebuild from the snapshot plus the events after it
+        restarted = EventSourcedVendingMachine.rebuild(1, log, SnapshotStore(snapshots.path))
+        print(f"Rebuilt: {STATES[restarted.state].__name__}, item_count={restarted.item_count}")
+        restarted.select_item()  # Item selected. Preparing to dispense.
+        log.close()
+
+        print()
+        check_crash(directory)
+        benchmark(directory)
@@ -0,0 +1,127 @@
+from contextlib import redirect_stdout
+import io
+import random
+import time
+
+import numpy as np
+
+from state import VendingMachine, OutOfStockState
+from compiled_state import (
+    EVENTS,
+    STATES,
+    TABLE,
+    INSERT_COIN,
+    SELECT_ITEM,
+    DISPENSE_ITEM,
+)
+
+# The compiled transition table as three NumPy lookup arrays indexed by
+# [state, event, stock class]
+MESSAGES = sorted({cell[0] for rows in TABLE for cells in rows for cell in cells})
+MESSAGE_IDS = {message: i for i, message in enumerate(MESSAGES)}
+NEXT_STATE = np.array([[[c[2] for c in cells] for cells in rows] for rows in TABLE], np.int8)
+DELTA = np.array([[[c[1] for c in cells] for cells in rows] for rows in TABLE], np.int32)
+MESSAGE = np.array(
+    [[[MESSAGE_IDS[c[0]] for c in cells] for cells in rows] for rows in TABLE], np.int16
+)
+
+
+# Context for N machines at once: one state code and one item_count per machine
+class VendingMachineFleet:
+    def __init__(self, item_counts):
+        self.item_count = np.asarray(item_counts, dtype=np.int32).copy()
+        self.state = np.zeros(len(self.item_count), dtype=np.int8)  # NoCoinState
+
+    def __len__(self):
+        return len(self.state)
+
+    def apply(self, event, mask=None):
+        # Applies one event to every machine selected by the mask (all by default)
+        # and returns the message id each of them produced.
+        selected = slice(None) if mask is None else np.flatnonzero(mask)
+        state = self.state[selected]  # A view when every machine is selected
+        stock = np.minimum(self.item_count[selected], 2)
+        messages = MESSAGE[state, event, stock]
+        self.item_count[selected] += DELTA[state, event, stock]
+        self.state[selected] = NEXT_STATE[state, event, stock]
+        return messages
+
+    def insert_coin(self, mask=None):
+        return self.apply(INSERT_COIN, mask)
+
+    def select_item(self, mask=None):
+        return self.apply(SELECT_ITEM, mask)
+
+    def dispense_item(self, mask=None):
+        return self.apply(DISPENSE_ITEM, mask)
+
+    def state_names(self):
+        return [STATES[code].__name__ for code in self.state]
+
+
+def check_parity(machines=200, steps=300, seed=0):
+    # Drives object machines and a fleet with the same random event stream and
+    # compares messages, states and item counts after every step.
+    rng = random.Random(seed)
+    item_counts = [rng.randint(0, 4) for _ in range(machines)]
+    objects = [VendingMachine(count) for count in item_counts]
+    fleet = VendingMachineFleet(item_counts)
+
+    for _ in range(steps):
+        event = rng.randrange(len(EVENTS))
+        if rng.random() < 0.2:
+            mask, selected = None, range(machines)
+        else:
+            mask = np.array([rng.random() < 0.5 for _ in range(machines)])
+            selected = np.flatnonzero(mask)
+        fleet_messages = fleet.apply(event, mask)
+        for machine_index, message_id in zip(selected, fleet_messages):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                getattr(objects[machine_index], EVENTS[event])()
+            assert output.getvalue().rstrip("\n") == MESSAGES[message_id]
+        for machine_index, machine in enumerate(objects):
+            assert type(machine._state).__name__ == STATES[fleet.state[machine_index]].__name__
+            assert machine.item_count == fleet.item_count[machine_index]
+    print(f"Parity: {machines} machines x {steps} random masked events match the object model.")
+
+
+def benchmark(machines=1_000_000, rounds=5):
+    fleet = VendingMachineFleet(np.full(machines, rounds, dtype=np.int32))
+    half = np.arange(machines) % 2 == 0
+    start = time.perf_counter()
+    transitions = 0
+    for _ in range(rounds):
+        fleet.insert_coin()
+        fleet.insert_coin(half)  # "Coin already inserted." for half of the fleet
+        fleet.select_item()
+        fleet.dispense_item()
+        transitions += 3 * machines + int(half.sum())
+    elapsed = time.perf_counter() - start
+    print(
+        f"Fleet of {machines:,}: {transitions / elapsed:,.0f} transitions/s "
+        f"({elapsed / rounds * 1000:.1f} ms per round)"
+    )
+    print(f"Memory: {fleet.state.nbytes + fleet.item_count.nbytes:,} bytes for the whole fleet")
+
+    # Every machine is out of stock now
+    assert (fleet.item_count == 0).all()
+    assert (fleet.state == STATES.index(OutOfStockState)).all()
+
+
+# Client code
+if __name__ == "__main__":
+    fleet = VendingMachineFleet([2, 1, 0])
+
+    for name, messages in (
+        ("insert_coin", fleet.insert_coin()),
+        ("select_item", fleet.select_item()),
+        ("dispense_item", fleet.dispense_item()),
+        ("insert_coin", fleet.insert_coin([True, True, False])),
+    ):
+        print(f"{name}: {[MESSAGES[i] for i in messages]}")
+    print(fleet.state_names(), fleet.item_count.tolist())
+
+    print()
+    check_parity()
+    benchmark()
@@ -0,0 +1,212 @@
+from collections import deque
+from typing import Callable, Dict, Iterable, List
+import random
+import statistics
+import time
+
+from strategy import PaymentStrategy, PaymentContext
+from async_payments import quantiles
+
+
+# Rolling per-strategy metrics: the last `window` outcomes plus an EWMA of latency
+class StrategyStats:
+    def __init__(self, window=100, alpha=0.2):
+        self._alpha = alpha
+        self._outcomes = deque(maxlen=window)  # (latency, ok) pairs
+        self._errors = 0  # Failures currently inside the window
+        self.ewma = None
+        self.calls = 0
+
+    def record(self, latency: float, ok: bool):
+        if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0][1]:
+            self._errors -= 1
+        self._outcomes.append((latency, ok))
+        self._errors += not ok
+        self.calls += 1
+        self.ewma = latency if self.ewma is None else self.ewma + self._alpha * (latency - self.ewma)
+
+    @property
+    def error_rate(self) -> float:
+        return self._errors / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        latencies = [latency for latency, _ in self._outcomes]
+        return {
+            "calls": self.calls,
+            "window": len(latencies),
+            "error_rate": self.error_rate,
+            "ewma_ms": None if self.ewma is None else self.ewma * 1000,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+            "max_ms": max(latencies) * 1000 if latencies else None,
+        }
+
+
+# Self-tuning Context: routes each payment to the fastest healthy strategy
+class AdaptivePaymentContext(PaymentContext):
+    def __init__(
+        self,
+        strategies: Dict[str, PaymentStrategy],
+        window=100,
+        alpha=0.2,
+        max_error_rate=0.2,
+        explore=0.05,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._strategies = dict(strategies)
+        self._stats = {name: StrategyStats(window, alpha) for name in self._strategies}
+        self._max_error_rate = max_error_rate
+        self._explore = explore
+        self._clock = clock
+        super().__init__(next(iter(self._strategies.values())))
+
+    def _ranked(self, names: List[str]) -> List[str]:
+        # Untried strategies first, then healthy ones by EWMA latency, then unhealthy ones
+        # by error rate. With probability `explore` a random strategy goes first, so a
+        # demoted strategy gets fresh samples and can win its place back once it recovers.
+        def key(name):
+            stats = self._stats[name]
+            if stats.ewma is None:
+                return (0, 0.0)
+            if stats.error_rate > self._max_error_rate:
+                return (2, stats.error_rate)
+            return (1, stats.ewma)
+
+        ranked = sorted(names, key=key)
+        if len(ranked) > 1 and random.random() < self._explore:
+            ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+        return ranked
+
+    def execute_payment(self, amount: float, candidates: Iterable[str] = None):
+        # Tries the candidates in ranked order and returns the name of the strategy
+        # that settled the payment; raises the last error if every candidate failed.
+        names = list(self._strategies) if candidates is None else list(candidates)
+        if not names:
+            raise ValueError("No candidate strategies to pay with")
+        unknown = [name for name in names if name not in self._strategies]
+        if unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+        error = None
+        for name in self._ranked(names):
+            started = self._clock()
+            try:
+                self._strategies[name].pay(amount)
+            except Exception as exc:
+                self._stats[name].record(self._clock() - started, False)
+                error = exc
+                continue
+            self._stats[name].record(self._clock() - started, True)
+            self._strategy = self._strategies[name]
+            return name
+        raise error
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+
+class PaymentDeclined(Exception):
+    pass
+
+
+# Simulation: strategies that advance a virtual clock instead of sleeping
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SimulatedPayment(PaymentStrategy):
+    def __init__(self, clock: SimulatedClock, latency: float, failure_rate=0.0):
+        self._clock = clock
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    def pay(self, amount: float) -> None:
+        self._clock.now += random.expovariate(1 / self.latency)
+        if random.random() < self.failure_rate:
+            raise PaymentDeclined(f"Payment of ${amount} was declined")
+
+
+# Baseline for the benchmark: picks a strategy at random for every payment
+class RandomPaymentContext(PaymentContext):
+    def __init__(self, strategies: List[PaymentStrategy]):
+        super().__init__(strategies[0])
+        self._choices = strategies
+
+    def execute_payment(self, amount: float):
+        self.set_strategy(random.choice(self._choices))
+        super().execute_payment(amount)
+
+
+def simulate(context_factory, payments, degrade_at):
+    # Credit card starts fastest, then degrades: slower and failing a quarter of the time
+    clock = SimulatedClock()
+    strategies = {
+        "credit_card": SimulatedPayment(clock, 0.010, 0.01),
+        "paypal": SimulatedPayment(clock, 0.020, 0.01),
+        "bitcoin": SimulatedPayment(clock, 0.060, 0.02),
+    }
+    context = context_factory(strategies, clock)
+    latencies, failures = [], 0
+    for i in range(payments):
+        if i == degrade_at:
+            strategies["credit_card"].latency = 0.080
+            strategies["credit_card"].failure_rate = 0.25
+        started = clock.now
+        try:
+            context.execute_payment(round(random.uniform(1, 500), 2))
+        except PaymentDeclined:
+            failures += 1
+        latencies.append(clock.now - started)
+    return context, latencies, failures
+
+
+def benchmark(payments=100_000):
+    def fixed(strategies, clock):
+        return PaymentContext(strategies["credit_card"])
+
+    def random_choice(strategies, clock):
+        return RandomPaymentContext(list(strategies.values()))
+
+    def adaptive(strategies, clock):
+        return AdaptivePaymentContext(strategies, clock=clock)
+
+    degrade_at = payments * 3 // 10
+    print(f"{payments:,} simulated payments; credit_card degrades after {degrade_at:,} of them\n")
+    for name, factory in (("fixed credit_card", fixed), ("random", random_choice), ("adaptive", adaptive)):
+        start = time.perf_counter()
+        context, latencies, failures = simulate(factory, payments, degrade_at)
+        elapsed = time.perf_counter() - start
+        cuts = quantiles(latencies)
+        print(
+            f"{name:<18} mean={statistics.fmean(latencies) * 1000:6.2f} ms  "
+            f"p99={cuts[98] * 1000:7.2f} ms  failed={failures:>6,}  "
+            f"({payments / elapsed:,.0f} decisions/s)"
+        )
+    print("\nadaptive stats after the run:")
+    for name, stats in context.stats().items():
+        print(
+            f"  {name:<12} calls={stats['calls']:>6,}  error_rate={stats['error_rate']:.2f}  "
+            f"ewma={stats['ewma_ms']:.1f} ms  p50={stats['p50_ms']:.1f} ms"
+        )
+
+
+# Usage: let the context pick a strategy
+if __name__ == "__main__":
+    clock = SimulatedClock()
+    context = AdaptivePaymentContext(
+        {
+            "credit_card": SimulatedPayment(clock, 0.010),
+            "paypal": SimulatedPayment(clock, 0.020),
+            "bitcoin": SimulatedPayment(clock, 0.060),
+        },
+        clock=clock,
+        explore=0.0,
+    )
+    chosen = [context.execute_payment(100.0) for _ in range(6)]
+    print(chosen)  # Each strategy is tried once, then the fastest one is used
+    print(context.execute_payment(50.0, candidates=["paypal", "bitcoin"]))
+
+    print()
+    benchmark()
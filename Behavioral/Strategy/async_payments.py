@@ -0,0 +1,282 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple
+import asyncio
+import random
+import socket
+import statistics
+import threading
+import time
+import uuid
+
+from strategy import PaymentStrategy, PaymentContext
+
+
+class PaymentFailed(Exception):
+    pass
+
+
+# Fake gateway: a local TCP server that answers "PAY <method> <amount> [<key>]" lines
+# after an injected delay, and fails a configurable share of the requests. A request
+# repeating an idempotency key gets the first request's answer and is not charged again.
+class FakeGateway:
+    def __init__(self, latency=0.005, jitter=0.002, failure_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.port = None
+        self.charged = 0
+        self._outcomes: Dict[bytes, asyncio.Future] = {}  # Never expire: fine for a fake
+        self._ready = threading.Event()
+
+    async def _charge(self):
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        if random.random() < self.failure_rate:
+            return b"ERR\n"
+        self.charged += 1
+        return b"OK\n"
+
+    async def _handle(self, reader, writer):
+        while line := await reader.readline():
+            parts = line.split()
+            if len(parts) < 4:
+                response = await self._charge()
+            else:
+                outcome = self._outcomes.get(parts[3])
+                if outcome is None:  # Also shared with a retry arriving while it runs
+                    outcome = self._outcomes[parts[3]] = asyncio.ensure_future(self._charge())
+                response = await outcome
+            writer.write(response)
+            await writer.drain()
+        writer.close()
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self):
+        threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True).start()
+        self._ready.wait()
+        return self.port
+
+
+# Synchronous strategy for comparison: one blocking request per payment
+class GatewayPayment(PaymentStrategy):
+    def __init__(self, method: str, port: int):
+        self._method = method
+        self._connection = socket.create_connection(("127.0.0.1", port))
+        self._responses = self._connection.makefile("rb")
+
+    def pay(self, amount: float) -> None:
+        self._connection.sendall(f"PAY {self._method} {amount}\n".encode())
+        if self._responses.readline() != b"OK\n":
+            raise PaymentFailed(f"{self._method} payment of ${amount} was declined")
+
+
+# Connection pool: up to `size` open gateway connections, reused across payments
+class ConnectionPool:
+    def __init__(self, port: int, size: int):
+        self._port = port
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def acquire(self):
+        await self._slots.acquire()
+        if not self._idle.empty():
+            return self._idle.get_nowait()
+        try:
+            connection = await asyncio.open_connection("127.0.0.1", self._port)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return connection
+
+    def release(self, connection, healthy=True):
+        if healthy:
+            self._idle.put_nowait(connection)
+        else:
+            connection[1].close()  # A cancelled request may leave an unread response
+        self._slots.release()
+
+    async def close(self):
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+            await writer.wait_closed()
+
+
+# Async Strategy Interface: `idempotency_key` identifies the payment across retries,
+# so the gateway charges it at most once
+class AsyncPaymentStrategy(ABC):
+    max_concurrency = 16
+
+    @abstractmethod
+    async def pay(self, amount: float, idempotency_key: str = None) -> None:
+        pass
+
+
+class AsyncGatewayPayment(AsyncPaymentStrategy):
+    method = "card"
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    async def pay(self, amount: float, idempotency_key: str = None) -> None:
+        request = f"PAY {self.method} {amount}" + (f" {idempotency_key}" if idempotency_key else "")
+        connection = await self._pool.acquire()
+        healthy = False
+        try:
+            reader, writer = connection
+            writer.write(f"{request}\n".encode())
+            await writer.drain()
+            response = await reader.readline()
+            healthy = True
+        finally:
+            self._pool.release(connection, healthy)
+        if response != b"OK\n":
+            raise PaymentFailed(f"{self.method} payment of ${amount} was declined")
+
+
+class AsyncCreditCardPayment(AsyncGatewayPayment):
+    method = "credit_card"
+    max_concurrency = 32
+
+
+class AsyncPayPalPayment(AsyncGatewayPayment):
+    method = "paypal"
+    max_concurrency = 16
+
+
+class AsyncBitcoinPayment(AsyncGatewayPayment):
+    method = "bitcoin"
+    max_concurrency = 8
+
+
+# Async Context: runs payments concurrently, at most `max_concurrency` per strategy,
+# with a timeout per attempt and exponential backoff between retries. A timed-out
+# attempt may still have been charged, so every retry of it reuses its idempotency key.
+class AsyncPaymentContext:
+    def __init__(self, strategy: AsyncPaymentStrategy, timeout=1.0, retries=2, backoff=0.01):
+        self._strategy = strategy
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._limits: Dict[AsyncPaymentStrategy, asyncio.Semaphore] = {}
+
+    def set_strategy(self, strategy: AsyncPaymentStrategy):
+        self._strategy = strategy
+
+    def _limit(self, strategy):
+        limit = self._limits.get(strategy)
+        if limit is None:
+            limit = self._limits[strategy] = asyncio.Semaphore(strategy.max_concurrency)
+        return limit
+
+    async def execute_payment(self, amount: float, strategy: AsyncPaymentStrategy = None):
+        strategy = strategy or self._strategy
+        limit = self._limit(strategy)
+        key = uuid.uuid4().hex
+        for attempt in range(self._retries + 1):
+            try:
+                async with limit:  # Released while backing off
+                    return await asyncio.wait_for(strategy.pay(amount, key), self._timeout)
+            except (PaymentFailed, asyncio.TimeoutError, OSError) as error:
+                if attempt == self._retries:
+                    raise
+                if isinstance(error, PaymentFailed):
+                    key = uuid.uuid4().hex  # A decline charged nothing: retry as a new payment
+            await asyncio.sleep(self._backoff * 2**attempt)
+
+    async def execute_many(
+        self, records: Iterable[Tuple[AsyncPaymentStrategy, float]]
+    ) -> List[object]:
+        # Returns None for each settled payment and the exception for each failed one
+        return await asyncio.gather(
+            *(self.execute_payment(amount, strategy) for strategy, amount in records),
+            return_exceptions=True,
+        )
+
+
+def quantiles(latencies):
+    # The 99 percentile cut points; inclusive, so they stay within the observed range
+    return statistics.quantiles(latencies, n=100, method="inclusive")
+
+
+def report(name, latencies, elapsed):
+    cuts = quantiles(latencies)
+    print(
+        f"{name:<22} {len(latencies) / elapsed:>10,.0f} payments/s  "
+        f"p50={cuts[49] * 1000:6.2f} ms  p99={cuts[98] * 1000:6.2f} ms"
+    )
+
+
+def benchmark(payments=2_000, latency=0.005, failure_rate=0.01):
+    gateway = FakeGateway(latency=latency, failure_rate=failure_rate)
+    port = gateway.start_in_thread()
+    amounts = [round(random.uniform(1, 500), 2) for _ in range(payments)]
+    print(f"{payments:,} payments, gateway latency ~{latency * 1000:.0f} ms, "
+          f"{failure_rate:.0%} declined and retried\n")
+
+    context = PaymentContext(GatewayPayment("credit_card", port))
+    latencies = []
+    start = time.perf_counter()
+    for amount in amounts:
+        began = time.perf_counter()
+        for attempt in range(3):
+            try:
+                context.execute_payment(amount)
+                break
+            except PaymentFailed:
+                if attempt == 2:
+                    raise
+        latencies.append(time.perf_counter() - began)
+    report("sequential (sync)", latencies, time.perf_counter() - start)
+
+    async def run_async():
+        strategies = [
+            strategy_class(ConnectionPool(port, strategy_class.max_concurrency))
+            for strategy_class in (AsyncCreditCardPayment, AsyncPayPalPayment, AsyncBitcoinPayment)
+        ]
+        context = AsyncPaymentContext(strategies[0], timeout=0.5)
+        latencies = []
+
+        async def timed(strategy, amount):
+            began = time.perf_counter()
+            await context.execute_payment(amount, strategy)
+            latencies.append(time.perf_counter() - began)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(timed(random.choice(strategies), amount) for amount in amounts),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - start
+        failures = sum(isinstance(result, Exception) for result in results)
+        report("async (pooled)", latencies, elapsed)
+        print(f"{'':<22} latencies include waiting for a concurrency slot in a burst of {payments:,}")
+        opened = ", ".join(f"{s.method}={s._pool.opened}" for s in strategies)
+        print(f"{'':<22} connections opened: {opened}; failed after retries: {failures}")
+        assert gateway.charged == 2 * payments - failures  # Both runs; nothing charged twice
+        for strategy in strategies:
+            await strategy._pool.close()
+
+    asyncio.run(run_async())
+
+
+# Usage
+if __name__ == "__main__":
+    async def settle():
+        pool = ConnectionPool(FakeGateway().start_in_thread(), size=4)
+        card, paypal = AsyncCreditCardPayment(pool), AsyncPayPalPayment(pool)
+        context = AsyncPaymentContext(card, timeout=0.5)
+        await context.execute_payment(100.0)
+        results = await context.execute_many([(card, 25.0), (paypal, 50.0), (card, 75.0)])
+        print(f"Settled concurrently: {results} over {pool.opened} pooled connections\n")
+        await pool.close()
+
+    asyncio.run(settle())
+    benchmark()
@@ -0,0 +1,87 @@
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List, Tuple, Type
+import os
+import random
+import time
+
+from strategy import (
+    PaymentStrategy,
+    PaymentContext,
+    CreditCardPayment,
+    PayPalPayment,
+    BitcoinPayment,
+)
+
+
+# Strategy Pool: one shared instance per payment method, created on first use
+class StrategyPool:
+    def __init__(self, registry: Dict[str, Type[PaymentStrategy]]):
+        self._registry = registry
+        self._instances: Dict[str, PaymentStrategy] = {}
+
+    def get(self, method: str) -> PaymentStrategy:
+        strategy = self._instances.get(method)
+        if strategy is None:
+            strategy = self._instances[method] = self._registry[method]()
+        return strategy
+
+
+DEFAULT_REGISTRY = {
+    "credit_card": CreditCardPayment,
+    "paypal": PayPalPayment,
+    "bitcoin": BitcoinPayment,
+}
+
+
+# Context that also settles a mixed stream of (method, amount) records
+class BatchPaymentContext(PaymentContext):
+    def __init__(self, strategy: PaymentStrategy, pool: StrategyPool = None):
+        super().__init__(strategy)
+        self._pool = pool or StrategyPool(DEFAULT_REGISTRY)
+
+    def execute_batch(self, records: Iterable[Tuple[str, float]]) -> Dict[str, int]:
+        # Group the amounts by method, then hand each strategy its whole group
+        groups: Dict[str, List[float]] = {}
+        for method, amount in records:
+            amounts = groups.get(method)
+            if amounts is None:
+                amounts = groups[method] = []
+            amounts.append(amount)
+        for method, amounts in groups.items():
+            self._pool.get(method).pay_many(amounts)
+        return {method: len(amounts) for method, amounts in groups.items()}
+
+
+def benchmark(payments=1_000_000):
+    methods = list(DEFAULT_REGISTRY)
+    records = [(random.choice(methods), round(random.uniform(1, 500), 2)) for _ in range(payments)]
+
+    # The concrete strategies print every payment; time the work, not the terminal
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        context = PaymentContext(CreditCardPayment())
+        for method, amount in records:
+            context.set_strategy(DEFAULT_REGISTRY[method]())  # A new strategy per payment
+            context.execute_payment(amount)
+        one_by_one = time.perf_counter() - start
+
+        start = time.perf_counter()
+        counts = BatchPaymentContext(CreditCardPayment()).execute_batch(records)
+        batched = time.perf_counter() - start
+
+    assert sum(counts.values()) == payments
+    print(f"{payments:,} mixed payments")
+    print(f"{'set_strategy + execute_payment':<32} {payments / one_by_one:>12,.0f} payments/s")
+    print(f"{'execute_batch (pooled, pay_many)':<32} {payments / batched:>12,.0f} payments/s")
+
+
+# Usage: settle a mixed batch
+if __name__ == "__main__":
+    context = BatchPaymentContext(CreditCardPayment())
+    counts = context.execute_batch(
+        [("credit_card", 100.0), ("paypal", 50.0), ("bitcoin", 200.0), ("credit_card", 25.0)]
+    )
+    print(counts)  # {'credit_card': 2, 'paypal': 1, 'bitcoin': 1}
+
+    print()
+    benchmark()
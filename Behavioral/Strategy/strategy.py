@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 # Step 1: Define the Strategy Interface
@@ -7,21 +8,47 @@ class PaymentStrategy(ABC):
     def pay(self, amount: float) -> None:
         pass
 
+    # Bulk hook: strategies that can settle many payments at once override this
+    def pay_many(self, amounts: List[float]) -> None:
+        for amount in amounts:
+            self.pay(amount)
+
 
 # Step 2: Implement Concrete Strategies
 class CreditCardPayment(PaymentStrategy):
+    def _message(self, amount: float) -> str:
+        return f"Paying ${amount} using Credit Card"
+
     def pay(self, amount: float) -> None:
-        print(f"Paying ${amount} using Credit Card")
+        print(self._message(amount))
+
+    def pay_many(self, amounts: List[float]) -> None:
+        if amounts:
+            print("\n".join(map(self._message, amounts)))
 
 
 class PayPalPayment(PaymentStrategy):
+    def _message(self, amount: float) -> str:
+        return f"Paying ${amount} using PayPal"
+
     def pay(self, amount: float) -> None:
-        print(f"Paying ${amount} using PayPal")
+        print(self._message(amount))
+
+    def pay_many(self, amounts: List[float]) -> None:
+        if amounts:
+            print("\n".join(map(self._message, amounts)))
 
 
 class BitcoinPayment(PaymentStrategy):
+    def _message(self, amount: float) -> str:
+        return f"Paying ${amount} using Bitcoin"
+
     def pay(self, amount: float) -> None:
-        print(f"Paying ${amount} using Bitcoin")
+        print(self._message(amount))
+
+    def pay_many(self, amounts: List[float]) -> None:
+        if amounts:
+            print("\n".join(map(self._message, amounts)))
 
 
 # Step 3: Create the Context
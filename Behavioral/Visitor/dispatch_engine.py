@@ -0,0 +1,153 @@
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+import os
+import time
+
+from visitor import (
+    Heading,
+    Paragraph,
+    Image,
+    DocumentVisitor,
+    HTMLExporter,
+    SpellChecker,
+    Document,
+)
+
+# Dispatch tables: {visitor class: {element class: unbound visit function}}, filled
+# the first time a visitor class meets an element class
+_TABLES: Dict[type, Dict[type, Callable]] = {}
+
+
+def _resolve(visitor_class, element_class):
+    # Heading -> visit_heading; subclasses of an element fall back to their base's method
+    for base in element_class.__mro__:
+        function = getattr(visitor_class, f"visit_{base.__name__.lower()}", None)
+        if function is not None:
+            return function
+    # Unknown element type: let it dispatch itself
+    return lambda visitor, element: element.accept(visitor)
+
+
+def dispatch_table(visitor_class) -> Dict[type, Callable]:
+    table = _TABLES.get(visitor_class)
+    if table is None:
+        table = _TABLES[visitor_class] = {}
+    return table
+
+
+def visit_function(visitor_class, element_class) -> Callable:
+    table = dispatch_table(visitor_class)
+    function = table.get(element_class)
+    if function is None:
+        function = table[element_class] = _resolve(visitor_class, element_class)
+    return function
+
+
+# Engine: one dictionary lookup per element instead of accept() + visit_*(), and any
+# number of visitors applied in a single pass over the elements
+class DispatchEngine:
+    def __init__(self, *visitors: DocumentVisitor):
+        self._visitors = visitors
+
+    def _bind(self, element_class):
+        return tuple(
+            visit_function(type(visitor), element_class).__get__(visitor)
+            for visitor in self._visitors
+        )
+
+    def run(self, elements):
+        # Bound methods are created once per element class for this run
+        bound = {}
+        if len(self._visitors) == 1:
+            for element in elements:
+                try:
+                    handler = bound[type(element)]
+                except KeyError:
+                    handler = bound[type(element)] = self._bind(type(element))[0]
+                handler(element)
+            return
+        for element in elements:
+            try:
+                handlers = bound[type(element)]
+            except KeyError:
+                handlers = bound[type(element)] = self._bind(type(element))
+            for handler in handlers:
+                handler(element)
+
+
+def accept_all(document: Document, *visitors: DocumentVisitor):
+    DispatchEngine(*visitors).run(document.elements)
+
+
+class WordCounter(DocumentVisitor):
+    def __init__(self):
+        self.words = 0
+        self.images = 0
+
+    def visit_heading(self, heading):
+        self.words += heading.text.count(" ") + 1
+
+    def visit_paragraph(self, paragraph):
+        self.words += paragraph.text.count(" ") + 1
+
+    def visit_image(self, image):
+        self.images += 1
+
+
+def build_document(elements):
+    document = Document()
+    for i in range(elements):
+        if i % 10 == 0:
+            document.add_element(Heading(f"Section {i // 10}"))
+        elif i % 10 == 9:
+            document.add_element(Image(f"figure{i}.png"))
+        else:
+            document.add_element(Paragraph(f"Paragraph {i} of the benchmark document."))
+    return document
+
+
+def benchmark(elements=1_000_000):
+    document = build_document(elements)
+
+    def timed(label, run, repeat=3):
+        elapsed = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            # Discard what the printing visitors write
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                run()
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(f"{label:<40} {elements / elapsed:>12,.0f} nodes/s")
+
+    print(f"{elements:,} elements")
+    counters = WordCounter(), WordCounter()
+    timed("WordCounter, document.accept", lambda: document.accept(counters[0]))
+    timed("WordCounter, dispatch engine", lambda: accept_all(document, counters[1]))
+    assert vars(counters[0]) == vars(counters[1])
+
+    counters = [WordCounter() for _ in range(3)]
+    timed("3 WordCounters, 3 x document.accept", lambda: [document.accept(c) for c in counters])
+    timed("3 WordCounters, one fused traversal", lambda: accept_all(document, *counters))
+
+    timed(
+        "HTMLExporter + SpellChecker, 2 x accept",
+        lambda: (document.accept(HTMLExporter()), document.accept(SpellChecker())),
+    )
+    timed(
+        "HTMLExporter + SpellChecker, fused",
+        lambda: accept_all(document, HTMLExporter(), SpellChecker()),
+    )
+
+
+# Usage
+if __name__ == "__main__":
+    document = Document()
+    document.add_element(Heading("Welcome to the Visitor Pattern"))
+    document.add_element(Paragraph("This is a simple example of the Visitor Pattern."))
+    document.add_element(Image("example.jpg"))
+
+    # Both visitors in one traversal: each element is exported, then spell-checked
+    accept_all(document, HTMLExporter(), SpellChecker())
+
+    print()
+    benchmark()
@@ -0,0 +1,242 @@
+from html import escape
+from typing import List
+import time
+import weakref
+
+from visitor import Heading, Paragraph, Image, DocumentVisitor, Document
+from dispatch_engine import visit_function, build_document
+
+
+# Document that versions its elements: every change gets a new version number and
+# is appended to a change log that each incremental result reads from. The log only
+# keeps the entries some registered result has not read yet.
+class VersionedDocument(Document):
+    def __init__(self):
+        super().__init__()
+        self.versions: List[int] = []
+        self.changes: List[int] = []  # Indexes of changed elements, oldest first
+        self.changes_start = 0  # Log position of changes[0]
+        self.layout = 0  # Bumped when elements are inserted or removed
+        self._clock = 0
+        self._readers = weakref.WeakSet()
+
+    @property
+    def changes_end(self) -> int:
+        return self.changes_start + len(self.changes)
+
+    def changes_since(self, position) -> List[int]:
+        return self.changes[position - self.changes_start :]
+
+    def register(self, reader):
+        # reader.consumed is the log position it has read up to
+        self._readers.add(reader)
+
+    def trim(self):
+        # Drops the entries every registered reader has already read
+        position = min((reader.consumed for reader in self._readers), default=self.changes_end)
+        position = max(position, self.changes_start)  # Readers behind a relayout start over anyway
+        del self.changes[: position - self.changes_start]
+        self.changes_start = position
+
+    def _touch(self, index):
+        self._clock += 1
+        self.versions[index] = self._clock
+        if self._readers:  # A reader registered later starts from a full render
+            self.changes.append(index)
+
+    def _relayout(self):
+        # Every reader starts over after a structure change, so the log is not needed
+        self.layout += 1
+        self.changes_start = self.changes_end
+        self.changes.clear()
+
+    def add_element(self, element):
+        super().add_element(element)
+        self.versions.append(0)
+        self._touch(len(self.elements) - 1)
+
+    def replace_element(self, index, element):
+        self.elements[index] = element
+        self._touch(index)
+
+    def edit(self, index, **attributes):
+        # document.edit(3, text="New text")
+        element = self.elements[index]
+        for name, value in attributes.items():
+            setattr(element, name, value)
+        self._touch(index)
+
+    def insert_element(self, index, element):
+        self.elements.insert(index, element)
+        self.versions.insert(index, 0)
+        self._relayout()
+        self._touch(index)
+
+    def remove_element(self, index):
+        del self.elements[index]
+        del self.versions[index]
+        self._relayout()
+
+
+# Renderer: a visitor whose visit_* methods return the element's output as a string
+class HTMLRenderer(DocumentVisitor):
+    def visit_heading(self, heading):
+        return f"<h1>{escape(heading.text, quote=False)}</h1>\n"
+
+    def visit_paragraph(self, paragraph):
+        return f"<p>{escape(paragraph.text, quote=False)}</p>\n"
+
+    def visit_image(self, image):
+        return f'<img src="{escape(image.src)}" />\n'
+
+
+# Incremental result: per-element output cached with the element version it was
+# computed from, grouped into blocks whose joined text is cached too
+class IncrementalResult:
+    def __init__(self, document: VersionedDocument, renderer: DocumentVisitor, block_size=1024):
+        self._document = document
+        self._renderer = renderer
+        self._block_size = block_size
+        self._handlers = {}
+        self._outputs: List[str] = []
+        self._versions: List[int] = []
+        self._blocks: List[str] = []
+        self._layout = None
+        self.consumed = 0  # Log position in document.changes already applied
+        self.recomputed = 0  # Elements recomputed by the last render()
+        document.register(self)
+
+    def _render_element(self, element):
+        handler = self._handlers.get(type(element))
+        if handler is None:
+            handler = self._handlers[type(element)] = visit_function(
+                type(self._renderer), type(element)
+            ).__get__(self._renderer)
+        return handler(element)
+
+    def _rebuild(self):
+        document = self._document
+        self._outputs = [self._render_element(element) for element in document.elements]
+        self._versions = list(document.versions)
+        size = self._block_size
+        self._blocks = [
+            "".join(self._outputs[start : start + size]) for start in range(0, len(self._outputs), size)
+        ]
+        self._layout = document.layout
+        self.consumed = document.changes_end
+        self.recomputed = len(self._outputs)
+
+    def render(self) -> str:
+        document = self._document
+        if document.layout != self._layout or self.consumed < document.changes_start:
+            # Inserts and removes shift every index after them, and the log entries this
+            # result has not read may be gone: start over
+            self._rebuild()
+            document.trim()
+            return "".join(self._blocks)
+
+        outputs, versions, size = self._outputs, self._versions, self._block_size
+        dirty_blocks = set()
+        self.recomputed = 0
+        for index in document.changes_since(self.consumed):
+            if index >= len(outputs):  # Appended since the last render
+                outputs.append("")
+                versions.append(-1)
+            if versions[index] != document.versions[index]:
+                outputs[index] = self._render_element(document.elements[index])
+                versions[index] = document.versions[index]
+                dirty_blocks.add(index // size)
+                self.recomputed += 1
+        self.consumed = document.changes_end
+        document.trim()
+
+        for block in sorted(dirty_blocks):
+            joined = "".join(outputs[block * size : (block + 1) * size])
+            if block < len(self._blocks):
+                self._blocks[block] = joined
+            else:
+                self._blocks.append(joined)
+        return "".join(self._blocks)
+
+
+def check_readers():
+    # Two results on one document: one renders before a relayout and one after it
+    document = VersionedDocument()
+    for i in range(6):
+        document.add_element(Paragraph(f"Paragraph {i}"))
+    early, late = IncrementalResult(document, HTMLRenderer()), IncrementalResult(document, HTMLRenderer())
+    early.render()
+    late.render()
+    document.edit(1, text="Edited before the relayout")
+    early.render()
+    document.insert_element(0, Heading("Inserted"))
+    early.render()
+    document.edit(4, text="Edited after the relayout")
+    early.render()
+    late.render()
+    document.edit(2, text="Edited again")
+    renderer = HTMLRenderer()
+    expected = "".join(
+        visit_function(HTMLRenderer, type(element))(renderer, element) for element in document.elements
+    )
+    assert early.render() == late.render() == expected
+    assert len(document.changes) == 0
+    print("Readers: results rendering on either side of a relayout agree with a full export.")
+
+
+def benchmark(elements=100_000, edits=100):
+    source = build_document(elements)
+    document = VersionedDocument()
+    for element in source.elements:
+        document.add_element(element)
+    renderer = HTMLRenderer()
+
+    def full_export():
+        return "".join(
+            visit_function(HTMLRenderer, type(element))(renderer, element)
+            for element in document.elements
+        )
+
+    incremental = IncrementalResult(document, renderer)
+    start = time.perf_counter()
+    incremental.render()
+    print(f"{elements:,} elements; first incremental render: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    full = single = 0.0
+    for i in range(edits):
+        index = (i * 7919) % elements
+        if isinstance(document.elements[index], Image):
+            document.edit(index, src=f"edited{i}.png")
+        else:
+            document.edit(index, text=f"Edited {i}")
+
+        start = time.perf_counter()
+        expected = full_export()
+        full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert incremental.render() == expected
+        single += time.perf_counter() - start
+        assert incremental.recomputed == 1
+
+    print(f"re-export after a single-element edit (mean of {edits}):")
+    print(f"  {'full re-export':<16} {full / edits * 1000:8.2f} ms")
+    print(f"  {'incremental':<16} {single / edits * 1000:8.2f} ms  ({full / single:.0f}x faster)")
+
+
+# Usage
+if __name__ == "__main__":
+    document = VersionedDocument()
+    document.add_element(Heading("Welcome to the Visitor Pattern"))
+    document.add_element(Paragraph("This is a simple example of the Visitor Pattern."))
+    document.add_element(Image("example.jpg"))
+
+    html = IncrementalResult(document, HTMLRenderer())
+    print(html.render(), end="")
+    document.edit(1, text="Only this paragraph is exported again.")
+    print(html.render(), end="")
+    print(f"Recomputed {html.recomputed} of {len(document.elements)} elements\n")
+
+    check_readers()
+
+    benchmark()
@@ -0,0 +1,214 @@
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Callable, List, Tuple
+import os
+import random
+import time
+
+from visitor import Heading, Paragraph, Image, DocumentVisitor, Document
+from dispatch_engine import visit_function
+
+# Columnar form of a run of elements: one kind byte per element, the end offset of
+# every element's text (or src), and all the texts concatenated. It pickles as just
+# three objects, and any text (NUL included) survives the round trip.
+KINDS = (Heading, Paragraph, Image)
+FIELDS = ("text", "text", "src")  # The attribute each kind keeps its value in
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+
+def to_columns(elements) -> Tuple[bytes, array, str]:
+    kinds = bytes(KIND_CODES[type(element)] for element in elements)
+    values = [getattr(element, FIELDS[kind]) for kind, element in zip(kinds, elements)]
+    ends = array("Q", accumulate(map(len, values)))
+    return kinds, ends, "".join(values)
+
+
+def _split(kinds: bytes, ends: array, text: str):
+    if len(ends) != len(kinds) or (ends and ends[-1] != len(text)):
+        raise ValueError("Columns do not line up: kinds, offsets and text disagree")
+    return map(text.__getitem__, map(slice, (0, *ends[:-1]), ends))
+
+
+def from_columns(kinds: bytes, ends: array, text: str) -> list:
+    return [KINDS[kind](value) for kind, value in zip(kinds, _split(kinds, ends, text))]
+
+
+# One reusable element per kind, and a setter for its slot, so a worker doesn't
+# allocate an element object per row
+def _cursors():
+    cursors = [kind.__new__(kind) for kind in KINDS]
+    setters = [getattr(kind, field).__set__ for kind, field in zip(KINDS, FIELDS)]
+    return cursors, setters
+
+
+# Merge protocol: a visitor that builds a result for one chunk of the document, and
+# combines the chunk results (in document order) into the result for the whole document
+class MergeableVisitor(DocumentVisitor, ABC):
+    @abstractmethod
+    def result(self):
+        pass
+
+    @classmethod
+    @abstractmethod
+    def merge(cls, parts: List[Tuple[int, object]]):
+        # parts: (index of the chunk's first element, chunk result) in document order
+        pass
+
+
+def _visit_chunk(visitor_factory, start, kinds, ends, text):
+    # The visitor sees a cursor element that is overwritten on every row, which is
+    # fine for visitors that only record results derived from the element
+    visitor = visitor_factory()
+    cursors, setters = _cursors()
+    handlers = [visit_function(type(visitor), kind).__get__(visitor) for kind in KINDS]
+    for kind, value in zip(kinds, _split(kinds, ends, text)):
+        element = cursors[kind]
+        setters[kind](element, value)
+        handlers[kind](element)
+    return start, visitor.result()
+
+
+def parallel_accept(
+    document: Document, visitor_factory: Callable[[], MergeableVisitor], workers=None, chunk_size=50_000
+):
+    # Runs a fresh visitor on every chunk of the document in a process pool and merges
+    # the results. The visitor must not depend on state from earlier elements, nor keep
+    # references to the elements it visits.
+    # `visitor_factory` must be picklable: a MergeableVisitor subclass or a
+    # functools.partial of one.
+    elements = document.elements
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                _visit_chunk, visitor_factory, start, *to_columns(elements[start : start + chunk_size])
+            )
+            for start in range(0, len(elements), chunk_size)
+        ]
+        parts = [future.result() for future in futures]
+    return _merge_class(visitor_factory).merge(parts)
+
+
+def _merge_class(visitor_factory):
+    return getattr(visitor_factory, "func", visitor_factory)  # Unwrap functools.partial
+
+
+def sequential_accept(document: Document, visitor_factory: Callable[[], MergeableVisitor]):
+    visitor = visitor_factory()
+    document.accept(visitor)
+    return _merge_class(visitor_factory).merge([(0, visitor.result())])
+
+
+# Mergeable Concrete Visitors
+DICTIONARY = frozenset(
+    "the a of to and in is it for on with as by this that visitor pattern document element "
+    "paragraph heading image example simple section figure export spell checker operation "
+    "structure class object new add without modify code".split()
+)
+
+
+class SpellingCollector(MergeableVisitor):
+    # Like SpellChecker, but collects (element index, word) for every unknown word
+    def __init__(self):
+        self._index = 0
+        self._misspelled = []
+
+    def _check(self, text):
+        for word in text.lower().split():
+            word = word.strip(".,:;!?")
+            if word and word not in DICTIONARY and not word.isdigit():
+                self._misspelled.append((self._index, word))
+        self._index += 1
+
+    def visit_heading(self, heading):
+        self._check(heading.text)
+
+    def visit_paragraph(self, paragraph):
+        self._check(paragraph.text)
+
+    def visit_image(self, image):
+        self._index += 1  # Spell-checking skipped for images
+
+    def result(self):
+        return self._misspelled
+
+    @classmethod
+    def merge(cls, parts):
+        return [(start + index, word) for start, misspelled in parts for index, word in misspelled]
+
+
+class HTMLCollector(MergeableVisitor):
+    def __init__(self):
+        self._lines = []
+
+    def visit_heading(self, heading):
+        self._lines.append(f"<h1>{heading.text}</h1>")
+
+    def visit_paragraph(self, paragraph):
+        self._lines.append(f"<p>{paragraph.text}</p>")
+
+    def visit_image(self, image):
+        self._lines.append(f'<img src="{image.src}" />')
+
+    def result(self):
+        return "\n".join(self._lines)
+
+    @classmethod
+    def merge(cls, parts):
+        return "\n".join(html for _, html in parts if html)
+
+
+def build_document(elements, seed=0):
+    rng = random.Random(seed)
+    words = sorted(DICTIONARY)
+    typos = ["vistor", "documnet", "exampel"]
+
+    def text(count):
+        # About one typo per thousand words
+        return " ".join(rng.choice(typos) if rng.random() < 0.001 else rng.choice(words) for _ in range(count))
+
+    document = Document()
+    for i in range(elements):
+        if i % 10 == 0:
+            document.add_element(Heading(text(4)))
+        elif i % 10 == 9:
+            document.add_element(Image(f"figure{i}.png"))
+        else:
+            document.add_element(Paragraph(text(24) + "."))
+    return document
+
+
+def benchmark(elements=1_000_000, chunk_size=50_000):
+    document = build_document(elements)
+    print(f"{elements:,} elements, {os.cpu_count()} CPU(s), chunks of {chunk_size:,}")
+
+    start = time.perf_counter()
+    expected = sequential_accept(document, SpellingCollector)
+    baseline = time.perf_counter() - start
+    print(f"{'sequential document.accept':<28} {baseline:6.2f} s  ({len(expected):,} misspellings)")
+
+    start = time.perf_counter()
+    to_columns(document.elements)
+    print(f"{'(encoding the columns)':<28} {time.perf_counter() - start:6.2f} s")
+
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        result = parallel_accept(document, SpellingCollector, workers, chunk_size)
+        elapsed = time.perf_counter() - start
+        assert result == expected
+        print(f"{f'{workers} worker(s)':<28} {elapsed:6.2f} s  speedup {baseline / elapsed:4.2f}x")
+
+
+# Usage
+if __name__ == "__main__":
+    document = Document()
+    document.add_element(Heading("Welcome to the Vistor Pattern"))
+    document.add_element(Paragraph("This is a simple exampel of the Visitor Pattern."))
+    document.add_element(Image("example.jpg"))
+
+    print(parallel_accept(document, SpellingCollector, workers=2, chunk_size=2))
+    print(parallel_accept(document, HTMLCollector, workers=2, chunk_size=2))
+
+    print()
+    benchmark()
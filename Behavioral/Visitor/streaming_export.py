@@ -0,0 +1,156 @@
+from contextlib import redirect_stdout
+from html import escape
+from typing import Callable, Iterator
+import io
+import os
+import tempfile
+import time
+
+from visitor import Heading, Paragraph, Image, DocumentVisitor, HTMLExporter, Document
+from dispatch_engine import visit_function, accept_all, build_document
+
+
+# Buffered writer: collects small writes and hands them to `write` in large blocks
+class BufferedTextWriter:
+    def __init__(self, write: Callable[[str], object], buffer_size=64 * 1024):
+        self._write = write
+        self._buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+        self.written = 0  # Characters handed to `write` so far
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            block = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self.written += len(block)
+            self._write(block)
+
+
+def escape_text(text: str) -> str:
+    # Most text has nothing to escape; three substring tests are cheaper than escape()
+    if "&" in text or "<" in text or ">" in text:
+        return escape(text, quote=False)
+    return text
+
+
+# Concrete Visitor: the same markup as HTMLExporter, written to a writer instead of
+# printed, with text and attribute values escaped
+class StreamingHTMLExporter(DocumentVisitor):
+    def __init__(self, writer: BufferedTextWriter):
+        self._write = writer.write
+
+    def visit_heading(self, heading):
+        self._write(f"<h1>{escape_text(heading.text)}</h1>\n")
+
+    def visit_paragraph(self, paragraph):
+        self._write(f"<p>{escape_text(paragraph.text)}</p>\n")
+
+    def visit_image(self, image):
+        self._write(f'<img src="{escape(image.src)}" />\n')
+
+
+def export_html(document: Document, target, buffer_size=64 * 1024) -> int:
+    # Writes the document to anything with a write(str) method (io.StringIO, an open
+    # text file, ...) and returns the number of characters written
+    writer = BufferedTextWriter(target.write, buffer_size)
+    accept_all(document, StreamingHTMLExporter(writer))
+    writer.flush()
+    return writer.written
+
+
+def iter_html(document: Document, chunk_size=64 * 1024) -> Iterator[str]:
+    # Yields the export in chunks of about `chunk_size` characters; only one chunk
+    # is in memory at a time
+    chunks = []
+    writer = BufferedTextWriter(chunks.append, chunk_size)
+    exporter = StreamingHTMLExporter(writer)
+    bound = {}
+    for element in document.elements:
+        handler = bound.get(type(element))
+        if handler is None:
+            handler = bound[type(element)] = visit_function(
+                StreamingHTMLExporter, type(element)
+            ).__get__(exporter)
+        handler(element)
+        if chunks:
+            yield chunks.pop()
+    writer.flush()
+    yield from chunks
+
+
+# Benchmark stdout: counts what print() writes and throws it away
+class CountingWriter:
+    def __init__(self):
+        self.characters = 0
+
+    def write(self, text):
+        self.characters += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def benchmark(directory, elements=1_000_000):
+    document = build_document(elements)
+
+    def timed(label, run):
+        start = time.perf_counter()
+        characters = run()
+        elapsed = time.perf_counter() - start
+        megabytes = characters / 2**20  # The markup is ASCII: one byte per character
+        print(f"{label:<36} {megabytes / elapsed:>8,.1f} MB/s  ({megabytes:.0f} MB in {elapsed:.2f} s)")
+        return characters
+
+    def printed():
+        counter = CountingWriter()  # Even with stdout discarded, print() is the bottleneck
+        with redirect_stdout(counter):
+            document.accept(HTMLExporter())
+        return counter.characters
+
+    def to_file():
+        path = os.path.join(directory, "document.html")
+        with open(path, "w") as file:
+            export_html(document, file)
+        return os.path.getsize(path)
+
+    def chunked():
+        largest = characters = 0
+        for chunk in iter_html(document):
+            characters += len(chunk)
+            largest = max(largest, len(chunk))
+        print(f"{'':<36} largest chunk: {largest:,} characters")
+        return characters
+
+    print(f"{elements:,} elements")
+    expected = timed("HTMLExporter (print)", printed)
+    assert timed("export_html -> io.StringIO", lambda: export_html(document, io.StringIO())) == expected
+    assert timed("export_html -> file", to_file) == expected
+    assert timed("iter_html (64 KB chunks)", chunked) == expected
+
+
+# Usage
+if __name__ == "__main__":
+    document = Document()
+    document.add_element(Heading("Fish & Chips"))
+    document.add_element(Paragraph("Use <em> sparingly."))
+    document.add_element(Image('photo "1".jpg'))
+
+    output = io.StringIO()
+    export_html(document, output)
+    print(output.getvalue(), end="")
+
+    # The same export, streamed in small chunks
+    print(list(iter_html(document, chunk_size=32)))
+
+    print()
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark(directory)
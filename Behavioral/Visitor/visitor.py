@@ -1,11 +1,15 @@
 # Element Interface: All elements in the document must implement this
 class DocumentElement:
+    __slots__ = ()
+
     def accept(self, visitor):
         pass
 
 
 # Concrete Elements: Heading, Paragraph, Image
 class Heading(DocumentElement):
+    __slots__ = ("text",)
+
     def __init__(self, text):
         self.text = text
 
@@ -14,6 +18,8 @@ class Heading(DocumentElement):
 
 
 class Paragraph(DocumentElement):
+    __slots__ = ("text",)
+
     def __init__(self, text):
         self.text = text
 
@@ -22,6 +28,8 @@ class Paragraph(DocumentElement):
 
 
 class Image(DocumentElement):
+    __slots__ = ("src",)
+
     def __init__(self, src):
         self.src = src
 
@@ -0,0 +1,184 @@
+from typing import Callable, Dict
+import asyncio
+import threading
+import time
+
+from thread_safe_singleton import ThreadSafeSingletonMeta
+
+
+# Lazy registry: each singleton is built by its factory on first access, exactly once,
+# and the time its initialization took is recorded
+class SingletonRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._async_factories: Dict[str, Callable] = {}
+        self._instances: Dict[str, object] = {}
+        self._pending: Dict[str, asyncio.Future] = {}  # Async constructions in flight
+        self._lock = threading.Lock()
+        self.init_times: Dict[str, float] = {}  # Seconds spent building each singleton
+
+    def register(self, name: str, factory: Callable = None):
+        # registry.register("config", Config), or as a decorator: @registry.register("config")
+        if factory is None:
+            return lambda factory: self.register(name, factory)
+        self._factories[name] = factory
+        return factory
+
+    def register_async(self, name: str, factory: Callable = None):
+        # For singletons wrapping pools or clients: `factory` is a coroutine function
+        if factory is None:
+            return lambda factory: self.register_async(name, factory)
+        self._async_factories[name] = factory
+        return factory
+
+    def _build(self, name, factory):
+        start = time.perf_counter()
+        instance = factory()
+        self.init_times[name] = time.perf_counter() - start
+        return instance
+
+    def get(self, name: str):
+        # Fast path: a single dict lookup once the singleton exists
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name in self._async_factories:
+            raise TypeError(f"{name!r} has an async factory; use 'await registry.aget({name!r})'")
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._instances[name] = self._build(name, self._factories[name])
+            return instance
+
+    async def aget(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._async_factories:
+            return self.get(name)
+        # Every concurrent awaiter shares the one construction in flight. shield() keeps
+        # a cancelled awaiter from cancelling the construction the others wait for.
+        pending = self._pending.get(name)
+        if pending is None:
+            pending = self._pending[name] = asyncio.ensure_future(self._abuild(name))
+        return await asyncio.shield(pending)
+
+    async def _abuild(self, name):
+        try:
+            start = time.perf_counter()
+            instance = await self._async_factories[name]()
+            self.init_times[name] = time.perf_counter() - start
+            self._instances[name] = instance
+            return instance
+        finally:
+            del self._pending[name]  # After a failure, the next aget() tries again
+
+    def report(self):
+        for name, seconds in sorted(self.init_times.items(), key=lambda item: -item[1]):
+            print(f"  {name:<16} {seconds * 1000:8.2f} ms")
+
+
+registry = SingletonRegistry()
+
+
+# The expensive setup both current variants repeat: __init__ runs on every call
+def expensive_setup(milliseconds=2):
+    end = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < end:
+        pass
+    return {"data": "Singleton Data"}
+
+
+class SingletonBase:
+    # singleton_using_baseclass__new__.py, without the prints
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+
+class SingletonMeta(type):
+    # singleton_using_metaclass__call__.py, without the prints
+    _instances = {}
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+
+class NewSingleton(SingletonBase):
+    def __init__(self):
+        self.settings = expensive_setup()
+
+
+class MetaSingleton(metaclass=SingletonMeta):
+    def __init__(self):
+        self.settings = expensive_setup()
+
+
+class LockedSingleton(metaclass=ThreadSafeSingletonMeta):
+    def __init__(self):
+        self.settings = expensive_setup()
+
+
+class Settings:
+    def __init__(self):
+        self.settings = expensive_setup()
+
+
+def benchmark(calls=1_000):
+    registry.register("settings", Settings)
+    variants = (
+        ("SingletonBase.__new__", NewSingleton),
+        ("SingletonMeta.__call__", MetaSingleton),
+        ("ThreadSafeSingletonMeta", LockedSingleton),
+        ("registry.get", lambda: registry.get("settings")),
+    )
+    print(f"{'':<26} {'cold':>10} {'repeated':>12}")
+    for label, access in variants:
+        start = time.perf_counter()
+        first = access()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(calls):
+            assert access() is first
+        repeated = (time.perf_counter() - start) / calls
+        print(f"{label:<26} {cold * 1000:7.2f} ms {repeated * 1e9:9,.0f} ns")
+
+    async def concurrent_cold_start(awaiters=1_000):
+        constructed = 0
+
+        @registry.register_async("client")
+        async def connect():
+            nonlocal constructed
+            constructed += 1
+            await asyncio.sleep(0.05)  # Opening connections
+            return object()
+
+        start = time.perf_counter()
+        clients = await asyncio.gather(*(registry.aget("client") for _ in range(awaiters)))
+        elapsed = time.perf_counter() - start
+        assert len({id(client) for client in clients}) == 1
+        print(f"\n{awaiters:,} concurrent aget('client'): constructed {constructed} time(s) "
+              f"in {elapsed * 1000:.1f} ms")
+
+    asyncio.run(concurrent_cold_start())
+    print("\nInitialization time per singleton:")
+    registry.report()
+
+
+# Usage
+if __name__ == "__main__":
+    @registry.register("config")
+    class Config:
+        def __init__(self):
+            print("Config.__init__ runs once")
+            self.data = "Singleton Data"
+
+    print(registry.get("config") is registry.get("config"))  # Output: True
+
+    print()
+    benchmark()
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import weakref
+
+
+class ThreadSafeSingletonMeta(type):
+    _instances = {}
+    _classes = weakref.WeakSet()  # Every class created with this metaclass
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        cls._singleton_lock = threading.Lock()  # One lock per class, never a global one
+        ThreadSafeSingletonMeta._classes.add(cls)
+
+    def __call__(cls, *args, **kwargs):
+        # Fast path: once the instance exists, a call is a single dict lookup
+        instance = cls._instances.get(cls)
+        if instance is not None:
+            return instance
+        # Slow path, first calls only: check again under the class's lock so that
+        # threads racing to create the instance build it exactly once
+        with cls._singleton_lock:
+            instance = cls._instances.get(cls)
+            if instance is None:
+                instance = cls._instances[cls] = super().__call__(*args, **kwargs)
+            return instance
+
+    @classmethod
+    def _after_fork_in_child(mcs):
+        # A lock held by another thread at fork time would stay locked forever in the
+        # child, so every class gets a fresh one. Classes with reset_on_fork = True
+        # (e.g. ones wrapping sockets or threads) are rebuilt in the child on first use.
+        for cls in list(mcs._classes):
+            cls._singleton_lock = threading.Lock()
+            if getattr(cls, "reset_on_fork", False):
+                mcs._instances.pop(cls, None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ThreadSafeSingletonMeta._after_fork_in_child)
+
+
+class Singleton(metaclass=ThreadSafeSingletonMeta):
+    def __init__(self):
+        self.data = "Singleton Data"
+
+
+class ConnectionPool(metaclass=ThreadSafeSingletonMeta):
+    reset_on_fork = True  # Each process needs its own connections
+
+    def __init__(self):
+        self.pid = os.getpid()
+
+
+# Baselines for the benchmark: the check-then-create of SingletonMeta (without its
+# prints), and a single global lock taken on every call
+class UnlockedSingletonMeta(type):
+    _instances = {}
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+
+class GlobalLockSingletonMeta(type):
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __call__(cls, *args, **kwargs):
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super().__call__(*args, **kwargs)
+            return cls._instances[cls]
+
+
+def _expensive_singleton(metaclass):
+    # A singleton whose __init__ is slow enough for threads to race through it
+    class Expensive(metaclass=metaclass):
+        constructed = 0
+
+        def __init__(self):
+            time.sleep(0.01)
+            type(self).constructed += 1
+
+    return Expensive
+
+
+def _run_threads(threads, target):
+    barrier = threading.Barrier(threads)
+
+    def run():
+        barrier.wait()
+        target()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def benchmark(threads=32, calls=100_000):
+    metaclasses = (
+        ("unlocked (SingletonMeta)", UnlockedSingletonMeta),
+        ("global lock", GlobalLockSingletonMeta),
+        ("double-checked, per-class", ThreadSafeSingletonMeta),
+    )
+
+    print(f"First call from {threads} threads at once, with a 10 ms __init__:")
+    for label, metaclass in metaclasses:
+        Expensive = _expensive_singleton(metaclass)
+        _run_threads(threads, Expensive)
+        print(f"  {label:<28} constructed {Expensive.constructed} time(s)")
+
+    print(f"\n{threads} threads x {calls:,} calls in a tight loop:")
+    for label, metaclass in metaclasses:
+        Cached = _expensive_singleton(metaclass)
+        Cached()
+
+        def loop():
+            for _ in range(calls):
+                Cached()
+
+        elapsed = _run_threads(threads, loop)
+        total = threads * calls
+        print(f"  {label:<28} {total / elapsed:>12,.0f} calls/s  {elapsed / total * 1e9:6.0f} ns/call")
+
+
+# Usage
+if __name__ == "__main__":
+    instance1 = Singleton()
+    instance2 = Singleton()
+    print(instance1 is instance2)  # Output: True
+
+    ConnectionPool()  # Built in the parent before the fork
+    if hasattr(os, "fork"):
+        pid = os.fork()
+        if pid == 0:
+            # The child reuses Singleton, but builds its own ConnectionPool
+            print(f"Child: same Singleton: {Singleton() is instance1}, "
+                  f"own ConnectionPool: {ConnectionPool().pid == os.getpid()}")
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+    print()
+    benchmark()
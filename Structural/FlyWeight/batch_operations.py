@@ -0,0 +1,148 @@
+from contextlib import redirect_stdout
+from typing import Callable, Sequence
+import io
+import time
+
+import numpy as np
+
+from fly_weight import Flyweight, FlyweightFactory
+from cache_policies import CachingFlyweightFactory
+
+
+def group_bounds(flyweight_index: np.ndarray, groups: int):
+    # Sorts the rows by flyweight: returns the order, and where each flyweight's run starts.
+    # With the index in the smallest unsigned dtype, NumPy's stable sort is a radix sort.
+    flyweight_index = flyweight_index.astype(np.min_scalar_type(max(groups - 1, 0)), copy=False)
+    order = np.argsort(flyweight_index, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(flyweight_index, minlength=groups))))
+    return order, bounds
+
+
+def operation_batch(
+    flyweights: Sequence[Flyweight],
+    flyweight_index: np.ndarray,
+    unique_states: np.ndarray,
+    operation: Callable = None,
+) -> np.ndarray:
+    # Runs the operation for every (flyweights[flyweight_index[i]], unique_states[i]) pair.
+    # The rows are sorted by flyweight once, and `operation(flyweight, unique_states)`
+    # handles each flyweight's contiguous run in one vectorized call. The results come
+    # back in input order.
+    operation = operation or describe_batch
+    flyweight_index = np.asarray(flyweight_index)
+    unique_states = np.asarray(unique_states)
+    if len(unique_states) != len(flyweight_index):
+        raise ValueError(
+            f"unique_states has {len(unique_states)} rows but flyweight_index has {len(flyweight_index)}; "
+            "they must be the same length"
+        )
+    if flyweight_index.size and (flyweight_index.min() < 0 or flyweight_index.max() >= len(flyweights)):
+        raise IndexError(f"flyweight_index values must be in range({len(flyweights)})")
+    order, bounds = group_bounds(flyweight_index, len(flyweights))
+    grouped = np.take(unique_states, order, axis=0)
+    parts = [
+        operation(flyweights[group], grouped[bounds[group] : bounds[group + 1]])
+        for group in range(len(flyweights))
+        if bounds[group] != bounds[group + 1]
+    ]
+    if not parts:
+        return np.empty(0)
+    # Back to input order; gathering through the inverse permutation is faster than
+    # scattering through `order`
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return np.take(np.concatenate(parts), inverse, axis=0)
+
+
+def describe_batch(flyweight: Flyweight, unique_states: np.ndarray) -> np.ndarray:
+    # The lines Flyweight.operation prints, for a whole group at once: the shared part
+    # is formatted once per flyweight
+    prefix = f"Shared: {flyweight.shared_state}, Unique: "
+    return np.char.add(prefix, unique_states.astype(str))
+
+
+# A flyweight with numeric intrinsic state: a sprite image of a given size, drawn at
+# many (x, y, scale) positions
+class Sprite(Flyweight):
+    __slots__ = ()
+
+    def bounds(self, x, y, scale):
+        _, width, height = self.shared_state
+        return (x, y, x + width * scale, y + height * scale)
+
+    def operation(self, unique_state):
+        print(f"Drawing {self.shared_state[0]} at {self.bounds(*unique_state)}")
+
+
+def bounds_batch(sprite: Sprite, positions: np.ndarray) -> np.ndarray:
+    # positions: an (n, 3) array of x, y, scale; returns an (n, 4) array of bounds
+    _, width, height = sprite.shared_state
+    x, y, scale = positions.T
+    return np.column_stack((x, y, x + width * scale, y + height * scale))
+
+
+def check_parity(items=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    factory = CachingFlyweightFactory()  # Leaves FlyweightFactory's shared table alone
+    flyweights = [factory.get_flyweight(f"shared_data_{i}") for i in range(7)]
+    index = rng.integers(0, len(flyweights), items)
+    unique = rng.integers(0, 10**6, items)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        for i, value in zip(index.tolist(), unique.tolist()):
+            flyweights[i].operation(value)
+    assert output.getvalue().splitlines() == operation_batch(flyweights, index, unique).tolist()
+
+    sprites = [Sprite((f"tree{i}", 16 + i, 32 - i)) for i in range(5)]
+    index = rng.integers(0, len(sprites), items)
+    positions = rng.random((items, 3)) * (1000, 1000, 2)
+    expected = [sprites[i].bounds(*position) for i, position in zip(index.tolist(), positions.tolist())]
+    assert np.array_equal(operation_batch(sprites, index, positions, bounds_batch), np.array(expected))
+    print(f"Parity: {items:,} items match the per-object operation, for text and numeric flyweights.")
+
+
+def benchmark(items=10_000_000, kinds=100, text_items=1_000_000):
+    rng = np.random.default_rng(1)
+    sprites = [Sprite((f"tree{i}", 16 + i % 32, 48 - i % 32)) for i in range(kinds)]
+    index = rng.integers(0, kinds, items)
+    positions = rng.random((items, 3)) * (1000, 1000, 2)
+
+    start = time.perf_counter()
+    batched = operation_batch(sprites, index, positions, bounds_batch)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    one_by_one = [sprites[i].bounds(*position) for i, position in zip(index.tolist(), positions.tolist())]
+    loop_time = time.perf_counter() - start
+    assert np.array_equal(batched[-1000:], np.array(one_by_one[-1000:]))
+    del one_by_one
+
+    print(f"{items:,} (sprite, position) pairs over {kinds} flyweights:")
+    print(f"  {'per-object bounds()':<28} {items / loop_time:>14,.0f} items/s")
+    print(f"  {'operation_batch (grouped)':<28} {items / batch_time:>14,.0f} items/s")
+
+    flyweights = [Flyweight(f"shared_data_{i}") for i in range(kinds)]
+    index = index[:text_items]
+    unique = rng.integers(0, 10**6, text_items)
+    start = time.perf_counter()
+    lines = [f"Shared: {flyweights[i].shared_state}, Unique: {v}" for i, v in zip(index.tolist(), unique.tolist())]
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = operation_batch(flyweights, index, unique)
+    batch_time = time.perf_counter() - start
+    assert batched[:1000].tolist() == lines[:1000]
+    print(f"{text_items:,} text lines (what operation() prints):")
+    print(f"  {'per-object f-string':<28} {text_items / loop_time:>14,.0f} items/s")
+    print(f"  {'operation_batch (grouped)':<28} {text_items / batch_time:>14,.0f} items/s")
+
+
+# Client code
+if __name__ == "__main__":
+    flyweights = [FlyweightFactory.get_flyweight("shared_data_1"), FlyweightFactory.get_flyweight("shared_data_2")]
+    for line in operation_batch(flyweights, [0, 1, 0], ["unique_data_1", "unique_data_2", "unique_data_3"]):
+        print(line)  # Shared: shared_data_1, Unique: unique_data_1 ...
+
+    print()
+    check_parity()
+    benchmark()
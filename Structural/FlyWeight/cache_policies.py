@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+import random
+import sys
+import time
+import tracemalloc
+import weakref
+
+from fly_weight import Flyweight, FlyweightFactory
+
+
+# Cache policies: where a factory keeps its flyweights, and which ones it gives up
+class CachePolicy(ABC):
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def put(self, key, flyweight):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class UnboundedPolicy(CachePolicy):
+    # What FlyweightFactory does: every flyweight is kept forever
+    def __init__(self):
+        super().__init__()
+        self._entries = {}
+
+    def get(self, key):
+        flyweight = self._entries.get(key)
+        if flyweight is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return flyweight
+
+    def put(self, key, flyweight):
+        self._entries[key] = flyweight
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LRUPolicy(CachePolicy):
+    # Keeps at most `max_entries` flyweights, evicting the least recently used
+    def __init__(self, max_entries=10_000):
+        super().__init__()
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        flyweight = self._entries.get(key)
+        if flyweight is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return flyweight
+
+    def put(self, key, flyweight):
+        self._entries[key] = flyweight
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class WeakValuePolicy(CachePolicy):
+    # Keeps a flyweight only while a client still references it
+    def __init__(self):
+        super().__init__()
+        self._entries = {}  # key -> weakref.ref(flyweight)
+
+    def get(self, key):
+        reference = self._entries.get(key)
+        flyweight = None if reference is None else reference()
+        if flyweight is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return flyweight
+
+    def put(self, key, flyweight):
+        def reclaimed(reference, key=key):
+            # Only drop the entry if it still points at the reclaimed flyweight
+            if self._entries.get(key) is reference:
+                del self._entries[key]
+                self.evictions += 1
+
+        self._entries[key] = weakref.ref(flyweight, reclaimed)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def estimate_size(flyweight) -> int:
+    # The flyweight plus its intrinsic state, and one level of container contents
+    state = flyweight.shared_state
+    size = sys.getsizeof(flyweight) + sys.getsizeof(state)
+    if isinstance(state, (tuple, list, frozenset, set)):
+        size += sum(sys.getsizeof(item) for item in state)
+    elif isinstance(state, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in state.items())
+    return size
+
+
+class ByteBudgetPolicy(CachePolicy):
+    # Keeps the estimated size of all cached flyweights under `max_bytes`,
+    # evicting the least recently used first
+    def __init__(self, max_bytes=16 * 2**20, sizeof=estimate_size):
+        super().__init__()
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (flyweight, size)
+        self.bytes = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, flyweight):
+        size = self._sizeof(flyweight)
+        self._entries[key] = (flyweight, size)
+        self.bytes += size
+        while self.bytes > self._max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "bytes": self.bytes}
+
+
+# Factory with a pluggable cache policy (unbounded by default, like FlyweightFactory)
+class CachingFlyweightFactory:
+    def __init__(self, policy: CachePolicy = None):
+        self.policy = UnboundedPolicy() if policy is None else policy
+
+    def get_flyweight(self, shared_state):
+        flyweight = self.policy.get(shared_state)
+        if flyweight is None:
+            flyweight = Flyweight(shared_state)
+            self.policy.put(shared_state, flyweight)
+        return flyweight
+
+    def stats(self) -> dict:
+        return self.policy.stats()
+
+
+def zipf_keys(lookups, distinct, exponent=1.1, drift=0, seed=0):
+    # Ranks drawn from a Zipf distribution; with drift, the popular keys slowly change
+    # over the stream, which is what makes an unbounded cache keep growing
+    rng = random.Random(seed)
+    weights = [1 / rank**exponent for rank in range(1, distinct + 1)]
+    ranks = rng.choices(range(distinct), weights, k=lookups)
+    return [f"intrinsic-state-{rank + (i * drift) // lookups:08d}" * 4 for i, rank in enumerate(ranks)]
+
+
+def benchmark(lookups=1_000_000, distinct=50_000, drift=200_000, held=1_000):
+    keys = zipf_keys(lookups, distinct, drift=drift)
+    print(f"{lookups:,} Zipf-distributed lookups over a drifting set of keys; "
+          f"clients hold the last {held:,} flyweights")
+    policies = (
+        ("FlyweightFactory", None),
+        ("unbounded", UnboundedPolicy),
+        ("LRU 10k entries", lambda: LRUPolicy(10_000)),
+        ("weak-value", WeakValuePolicy),
+        ("byte budget 2 MB", lambda: ByteBudgetPolicy(2 * 2**20)),
+    )
+    for label, policy in policies:
+        # Latency from an untraced run, retained memory from a second, traced one
+        elapsed = retained = 0
+        for traced in (False, True):
+            if policy is None:
+                class Factory(FlyweightFactory):
+                    _flyweights = {}  # Its own table; FlyweightFactory's shared one is left alone
+
+                get_flyweight = Factory.get_flyweight
+            else:
+                factory = CachingFlyweightFactory(policy())
+                get_flyweight = factory.get_flyweight
+            in_use = deque(maxlen=held)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            for key in keys:
+                in_use.append(get_flyweight(key))
+            if traced:
+                retained, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            else:
+                elapsed = time.perf_counter() - start
+
+        if policy is None:
+            summary = f"entries={len(Factory._flyweights):>7,}"
+        else:
+            stats = factory.stats()
+            summary = (f"entries={stats['entries']:>7,}  hit rate={stats['hit_rate']:.1%}  "
+                       f"evictions={stats['evictions']:>7,}")
+        print(f"  {label:<18} {elapsed / lookups * 1e9:5.0f} ns/lookup  "
+              f"retained {retained / 2**20:6.1f} MB  {summary}")
+
+
+# Client code
+if __name__ == "__main__":
+    factory = CachingFlyweightFactory(LRUPolicy(max_entries=2))
+    factory.get_flyweight("shared_data_1").operation("unique_data_1")
+    factory.get_flyweight("shared_data_2").operation("unique_data_2")
+    factory.get_flyweight("shared_data_1").operation("unique_data_3")  # Hit
+    factory.get_flyweight("shared_data_3").operation("unique_data_4")  # Evicts shared_data_2
+    print(factory.stats())
+
+    print()
+    benchmark()
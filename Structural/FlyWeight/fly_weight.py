@@ -1,4 +1,6 @@
 class Flyweight:
+    __slots__ = ("shared_state", "__weakref__")
+
     def __init__(self, shared_state):
         self.shared_state = shared_state  # Intrinsic state
 
@@ -17,15 +19,16 @@ class FlyweightFactory:
 
 
 # Client code
-factory = FlyweightFactory()
+if __name__ == "__main__":
+    factory = FlyweightFactory()
 
-# Adding objects with shared and unique states
-flyweight1 = factory.get_flyweight("shared_data_1")
-flyweight1.operation("unique_data_1")  # Shared: shared_data_1, Unique: unique_data_1
+    # Adding objects with shared and unique states
+    flyweight1 = factory.get_flyweight("shared_data_1")
+    flyweight1.operation("unique_data_1")  # Shared: shared_data_1, Unique: unique_data_1
 
-flyweight2 = factory.get_flyweight("shared_data_2")
-flyweight2.operation("unique_data_2")  # Shared: shared_data_2, Unique: unique_data_2
+    flyweight2 = factory.get_flyweight("shared_data_2")
+    flyweight2.operation("unique_data_2")  # Shared: shared_data_2, Unique: unique_data_2
 
-# Reusing existing flyweight
-flyweight3 = factory.get_flyweight("shared_data_1")
-flyweight3.operation("unique_data_3")  # Shared: shared_data_1, Unique: unique_data_3
+    # Reusing existing flyweight
+    flyweight3 = factory.get_flyweight("shared_data_1")
+    flyweight3.operation("unique_data_3")  # Shared: shared_data_1, Unique: unique_data_3
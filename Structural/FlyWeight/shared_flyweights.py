@@ -0,0 +1,254 @@
+from multiprocessing import shared_memory
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import tracemalloc
+import zlib
+
+from fly_weight import Flyweight
+from cache_policies import CachingFlyweightFactory, CachePolicy
+
+
+# Thread-safe factory: the check-then-insert in get_flyweight runs under a lock, so two
+# threads asking for the same new state get the same flyweight
+class ThreadSafeFlyweightFactory(CachingFlyweightFactory):
+    def __init__(self, policy: CachePolicy = None):
+        super().__init__(policy)
+        self._lock = threading.Lock()
+
+    def get_flyweight(self, shared_state):
+        with self._lock:
+            return super().get_flyweight(shared_state)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return super().stats()
+
+
+# Shared intern table: every intrinsic state (bytes) stored once in a SharedMemory block
+# that any process can attach to by name. Layout:
+#   header (count, slot count) | offsets: count + 1 x u64 | hash slots: slot count x i64
+#   (index of the state, or -1) | the states, back to back
+HEADER = struct.Struct("<QQ")
+
+
+class SharedInternTable:
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self._memory = memory
+        self._owner = owner
+        self.count, slot_count = HEADER.unpack_from(memory.buf)
+        offsets_end = HEADER.size + 8 * (self.count + 1)
+        self._offsets = memory.buf[HEADER.size : offsets_end].cast("Q")
+        self._slots = memory.buf[offsets_end : offsets_end + 8 * slot_count].cast("q")
+        self._data = memory.buf[offsets_end + 8 * slot_count :]
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @classmethod
+    def create(cls, states) -> "SharedInternTable":
+        # Interns the distinct states once; the creating process owns the block
+        states = list(dict.fromkeys(states))
+        slot_count = max(8, 2 * len(states))  # Load factor of at most 1/2
+        offsets_size = 8 * (len(states) + 1)
+        data_size = sum(len(state) for state in states)
+        memory = shared_memory.SharedMemory(
+            create=True, size=HEADER.size + offsets_size + 8 * slot_count + max(1, data_size)
+        )
+        HEADER.pack_into(memory.buf, 0, len(states), slot_count)
+        table = cls(memory, owner=True)
+        table._slots[:] = memoryview(struct.pack(f"<{slot_count}q", *[-1] * slot_count)).cast("q")
+        position = 0
+        for index, state in enumerate(states):
+            table._offsets[index] = position
+            table._data[position : position + len(state)] = state
+            position += len(state)
+            slot = zlib.crc32(state) % slot_count
+            while table._slots[slot] != -1:
+                slot = (slot + 1) % slot_count
+            table._slots[slot] = index
+        table._offsets[len(states)] = position
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedInternTable":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    def view(self, index: int) -> memoryview:
+        # A zero-copy, read-only view of the state: no bytes are copied into this process
+        return self._data[self._offsets[index] : self._offsets[index + 1]].toreadonly()
+
+    def index(self, state: bytes) -> int:
+        # Open addressing with linear probing; -1 if the state was never interned
+        slot_count = len(self._slots)
+        slot = zlib.crc32(state) % slot_count
+        while True:
+            index = self._slots[slot]
+            if index == -1:
+                return -1
+            if self._data[self._offsets[index] : self._offsets[index + 1]] == state:
+                return index
+            slot = (slot + 1) % slot_count
+
+    def close(self):
+        # Every view handed out by view() must be released first, or closing raises
+        # BufferError; the owner unlinks the block either way, so it does not leak
+        try:
+            for view in (self._offsets, self._slots, self._data):
+                view.release()
+            self._memory.close()
+        finally:
+            if self._owner:
+                self._memory.unlink()
+
+
+class SharedFlyweight:
+    __slots__ = ("_table", "index", "__weakref__")
+
+    def __init__(self, table: SharedInternTable, index: int):
+        self._table = table
+        self.index = index
+
+    @property
+    def shared_state(self) -> memoryview:
+        return self._table.view(self.index)
+
+    def operation(self, unique_state):
+        print(f"Shared: {bytes(self.shared_state).decode()}, Unique: {unique_state}")
+
+
+# Private fallback for states missing from the table: prints its state decoded, like
+# SharedFlyweight
+class BytesFlyweight(Flyweight):
+    __slots__ = ()
+
+    def operation(self, unique_state):
+        print(f"Shared: {bytes(self.shared_state).decode()}, Unique: {unique_state}")
+
+
+# Factory for one process: flyweights point into the shared table; only states that
+# were not interned up front get a private BytesFlyweight
+class SharedFlyweightFactory(ThreadSafeFlyweightFactory):
+    def __init__(self, table: SharedInternTable, policy: CachePolicy = None):
+        super().__init__(policy)
+        self._table = table
+
+    def get_flyweight(self, shared_state: bytes):
+        with self._lock:
+            flyweight = self.policy.get(shared_state)
+            if flyweight is None:
+                index = self._table.index(shared_state)
+                if index == -1:
+                    flyweight = BytesFlyweight(shared_state)
+                else:
+                    flyweight = SharedFlyweight(self._table, index)
+                self.policy.put(shared_state, flyweight)
+            return flyweight
+
+
+def make_state(index, size):
+    # Deterministic intrinsic state, so every worker can produce the same keys
+    return (b"%08d" % index * (size // 8 + 1))[:size]
+
+
+SMAPS = "/proc/self/smaps_rollup"  # Linux only
+
+
+def memory_usage():
+    # (RSS, PSS) in bytes; PSS splits each shared page between the processes mapping it.
+    # Without /proc, both are the Python memory tracemalloc has traced since it started.
+    if not os.path.exists(SMAPS):
+        current, _ = tracemalloc.get_traced_memory()
+        return current, current
+    with open(SMAPS) as file:
+        fields = dict(line.split(":")[:2] for line in file if line.startswith(("Rss:", "Pss:")))
+    return tuple(int(fields[name].split()[0]) * 1024 for name in ("Rss", "Pss"))
+
+
+def _worker(mode, name, states, size, results, barrier):
+    if not os.path.exists(SMAPS):
+        tracemalloc.start()
+    if mode == "private":
+        # Each process builds and keeps its own copy of every intrinsic state
+        flyweights = {}
+        for i in range(states):
+            state = make_state(i, size)
+            flyweights[state] = Flyweight(state)
+        touched = sum(flyweight.shared_state[0] for flyweight in flyweights.values())
+    else:
+        table = SharedInternTable.attach(name)
+        touched = 0
+        for i in range(states):
+            view = table.view(i)
+            touched += view[0] + view[-1]  # Map the pages the worker reads
+            view.release()
+    results.put((touched > 0,) + memory_usage())
+    barrier.wait()  # Stay alive until every worker has measured itself
+    if mode == "shared":
+        table.close()
+
+
+def _print_state(name, state):
+    table = SharedInternTable.attach(name)
+    view = table.view(table.index(state))
+    print(f"Child process {os.getpid()} reads: {bytes(view)}")
+    view.release()
+    table.close()
+
+
+def benchmark(workers=8, states=8_192, size=4_096):
+    # fork where the platform has it; spawn (Windows, macOS default) re-imports this module
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    total = states * size
+    print(f"{workers} workers, {states:,} intrinsic states of {size:,} bytes ({total / 2**20:.0f} MB)")
+    if not os.path.exists(SMAPS):
+        print("  No /proc/self/smaps_rollup: RSS and PSS below are tracemalloc's traced memory")
+    for mode in ("private", "shared"):
+        table = None
+        if mode == "shared":
+            table = SharedInternTable.create(make_state(i, size) for i in range(states))
+        results, barrier = context.Queue(), context.Barrier(workers)
+        start = time.perf_counter()
+        processes = [
+            context.Process(
+                target=_worker, args=(mode, table and table.name, states, size, results, barrier)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        measured = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        if table is not None:
+            table.close()
+        assert all(ok for ok, _, _ in measured)
+        rss = sum(r for _, r, _ in measured)
+        pss = sum(p for _, _, p in measured)
+        label = "per-process dicts" if mode == "private" else "shared_memory table"
+        print(f"  {label:<20} total RSS {rss / 2**20:7.1f} MB  total PSS {pss / 2**20:7.1f} MB  "
+              f"({elapsed:.2f} s)")
+
+
+# Client code
+if __name__ == "__main__":
+    table = SharedInternTable.create([b"shared_data_1", b"shared_data_2"])
+    factory = SharedFlyweightFactory(table)
+    factory.get_flyweight(b"shared_data_1").operation("unique_data_1")
+    factory.get_flyweight(b"shared_data_2").operation("unique_data_2")
+    factory.get_flyweight(b"shared_data_1").operation("unique_data_3")  # Same flyweight
+    factory.get_flyweight(b"not_interned").operation("unique_data_4")  # Private fallback
+
+    # A child process attaches by name and reads the same bytes without copying them
+    child = multiprocessing.Process(target=_print_state, args=(table.name, b"shared_data_2"))
+    child.start()
+    child.join()
+    table.close()
+
+    print()
+    benchmark()